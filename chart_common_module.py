@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+일봉/주봉/월봉 차트 공통 그리기 모듈
+"""
+
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+
+def add_threshold_lines(ax, levels):
+    """수평 기준선들을 하나의 LineCollection으로 추가하고 범례용 핸들을 반환
+    
+    levels: (y값, 색상, 선 스타일, 투명도, 선 두께, 범례 라벨) 튜플 리스트 (라벨이 None이면 범례 제외)
+    """
+    # x는 축 비율(0~1), y는 데이터 좌표 → axhline과 동일하게 축 전체 폭으로 그려짐
+    hlines = LineCollection(
+        [[(0, y), (1, y)] for y, *_ in levels],
+        colors=[to_rgba(color, alpha) for _, color, _, alpha, _, _ in levels],
+        linestyles=[linestyle for _, _, linestyle, _, _, _ in levels],
+        linewidths=[linewidth for _, _, _, _, linewidth, _ in levels],
+        transform=ax.get_yaxis_transform(),
+        zorder=2,
+    )
+    ax.add_collection(hlines, autolim=False)
+    
+    return [Line2D([], [], color=color, linestyle=linestyle, alpha=alpha, linewidth=linewidth, label=label)
+            for _, color, linestyle, alpha, linewidth, label in levels if label]
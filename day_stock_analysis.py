@@ -4,16 +4,23 @@
 국내 주식 일봉 시세 조회 스크립트
 """
 
-# matplotlib 백엔드를 Agg로 설정 (tkinter 에러 방지)
+# matplotlib 백엔드 설정 (tkinter 에러 방지)
+# mplcairo가 설치되어 있으면 Cairo 백엔드로 더 빠르게 렌더링, 없으면 Agg 사용
 import matplotlib
-matplotlib.use('Agg')
+try:
+    import mplcairo
+    matplotlib.use('module://mplcairo.base')
+except ImportError:
+    matplotlib.use('Agg')
 
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import matplotlib.font_manager as fm
-import mplfinance as mpf
+# 일봉/주봉/월봉 공통 차트 그리기 함수
+from chart_common_module import add_threshold_lines
 import platform
 import os
 # Yahoo Finance 데이터 모듈 import
@@ -23,6 +30,11 @@ import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 import json
+# orjson (선택 설치) - 있으면 JSON 저장에 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 운영체제별 한글 폰트 설정
 system = platform.system()
@@ -138,41 +150,46 @@ def get_stock_data(stock_code):
     print("   - 네트워크 연결에 문제가 있습니다")
     return None
 
+def _ema(values, span):
+    """지수이동평균(EMA) 계산 - pandas ewm(adjust=False)를 ndarray에 바로 적용 (데이터가 span보다 짧아도 계산됨)"""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
 def calculate_technical_indicators(df):
     """기술적 지표 계산"""
+    close = df['Close']
+    cols = {}
+    
     # 이동평균선
-    df['MA5'] = df['Close'].rolling(window=5).mean()
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    df['MA60'] = df['Close'].rolling(window=60).mean()
-    df['MA120'] = df['Close'].rolling(window=120).mean()
+    cols['MA5'] = close.rolling(window=5).mean().to_numpy()
+    cols['MA20'] = close.rolling(window=20).mean().to_numpy()
+    cols['MA60'] = close.rolling(window=60).mean().to_numpy()
+    cols['MA120'] = close.rolling(window=120).mean().to_numpy()
     
     # 볼린저 밴드 계산 (20일 기준)
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    cols['BB_Middle'] = cols['MA20']
+    bb_std = close.rolling(window=20).std().to_numpy()
+    cols['BB_Upper'] = cols['BB_Middle'] + (bb_std * 2)
+    cols['BB_Lower'] = cols['BB_Middle'] - (bb_std * 2)
     
     # MACD 계산 (표준 공식)
     # MACD = 12일 EMA - 26일 EMA
     # Signal = MACD의 9일 EMA
     # Histogram = MACD - Signal
-    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = ema12 - ema26
-    df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
+    close_values = close.to_numpy()
+    ema12 = _ema(close_values, 12)
+    ema26 = _ema(close_values, 26)
+    cols['MACD'] = ema12 - ema26
+    cols['MACD_Signal'] = _ema(cols['MACD'], 9)
+    cols['MACD_Histogram'] = cols['MACD'] - cols['MACD_Signal']
     
     # RSI 계산 (표준 공식)
     # RSI = 100 - (100 / (1 + RS))
     # RS = 평균 상승폭 / 평균 하락폭
-    delta = df['Close'].diff()
+    delta = close.diff()
     
     # 상승폭과 하락폭 분리
-    gain = delta.copy()
-    loss = delta.copy()
-    gain[gain < 0] = 0
-    loss[loss > 0] = 0
-    loss = abs(loss)
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
     
     # 14일 평균 계산
     avg_gain = gain.rolling(window=14).mean()
@@ -180,9 +197,10 @@ def calculate_technical_indicators(df):
     
     # RS와 RSI 계산
     rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    cols['RSI'] = (100 - (100 / (1 + rs))).to_numpy()
     
-    return df
+    # 컬럼을 하나씩 추가하지 않고 한 번에 붙여 새 DataFrame 반환 (원본 df는 변경하지 않음)
+    return pd.concat([df, pd.DataFrame(cols, index=df.index)], axis=1)
 
 def analyze_stock_data(hist, stock_code):
     """주식 일봉 데이터 분석"""
@@ -219,7 +237,7 @@ def analyze_stock_data(hist, stock_code):
     print(f"   최소 일봉 거래량: {hist['Volume'].min():,.0f}주")
     
     # 기술적 지표 계산
-    df_with_indicators = calculate_technical_indicators(hist.copy())
+    df_with_indicators = calculate_technical_indicators(hist)
     
     # 기술적 지표 정보
     print(f"\n📊 기술적 지표 (최근값):")
@@ -250,7 +268,7 @@ def analyze_stock_data(hist, stock_code):
     else:
         print("   MACD 신호: 하락 추세")
 
-def create_stock_chart(hist, stock_code):
+def create_stock_chart(hist, stock_code, dpi=150):
     """주식 일봉 차트 생성 (캔들차트 + 보조지표) - test_overlay_chart.py 스타일 적용"""
     if hist is None or hist.empty:
         return None, None
@@ -258,9 +276,12 @@ def create_stock_chart(hist, stock_code):
     print(f"\n📈 일봉 캔들차트를 생성합니다...")
     
     # 기술적 지표 계산
-    df = calculate_technical_indicators(hist.copy())
+    df = calculate_technical_indicators(hist)
     df.index.name = 'Date'
     
+    # 날짜 → matplotlib 수치 좌표 변환을 한 번만 수행하고 모든 패널에서 재사용
+    x = mdates.date2num(df.index.to_pydatetime())
+    
     # 차트 생성 (4개 패널: 메인차트, 거래량, RSI, MACD)
     fig, axes = plt.subplots(4, 1, figsize=(15, 16), height_ratios=[8, 2, 2, 2])
     fig.suptitle(f'{stock_code} Daily Stock Chart (240 Days) - Image Reference Style', fontsize=16, fontweight='bold')
@@ -269,28 +290,27 @@ def create_stock_chart(hist, stock_code):
     ax1 = axes[0]
     
     # 볼린저 밴드 영역 채우기 (이미지 참고 - 오렌지/베이지 스타일)
-    ax1.fill_between(df.index, df['BB_Upper'], df['BB_Lower'], 
+    ax1.fill_between(x, df['BB_Upper'], df['BB_Lower'], 
                      alpha=0.15, color='#FFE4B5', label='Bollinger Bands')
     
     # 볼린저 밴드 상단과 하단을 오렌지/베이지 색으로 표시 (범례에 표시하지 않음)
-    ax1.plot(df.index, df['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
-    ax1.plot(df.index, df['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+    ax1.plot(x, df['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+    ax1.plot(x, df['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
     
     # 캔들차트 그리기 (이미지 참고 - 빨간색/파란색)
-    for date, row in df.iterrows():
-        if row['Close'] >= row['Open']:  # 상승
-            color = '#FF4444'  # 빨간색
-        else:  # 하락
-            color = '#4444FF'  # 파란색
-        
-        ax1.plot([date, date], [row['Low'], row['High']], color=color, linewidth=1.0)
-        ax1.plot([date, date], [row['Open'], row['Close']], color=color, linewidth=3.0)
+    # 상승/하락 색상은 한 번의 배열 비교로 미리 계산 (거래량 차트에서도 재사용)
+    candle_colors = np.where(df['Close'].to_numpy() >= df['Open'].to_numpy(), '#FF4444', '#4444FF')  # 상승: 빨간색, 하락: 파란색
+    # iterrows() 대신 튜플로 순회 (행마다 Series를 만들지 않음)
+    ohlc = df[['Open', 'High', 'Low', 'Close']].itertuples(index=False, name=None)
+    for xi, color, (open_, high, low, close) in zip(x, candle_colors, ohlc):
+        ax1.plot([xi, xi], [low, high], color=color, linewidth=1.0)
+        ax1.plot([xi, xi], [open_, close], color=color, linewidth=3.0)
     
     # 이동평균선 추가 (웹 트레이딩 스타일 유지)
-    ax1.plot(df.index, df['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')      # 주황색
-    ax1.plot(df.index, df['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')    # 보라색
-    ax1.plot(df.index, df['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')    # 청록색
-    ax1.plot(df.index, df['MA120'], color='#84CC16', linewidth=2.0, alpha=0.9, label='MA120')  # 연두색
+    ax1.plot(x, df['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')      # 주황색
+    ax1.plot(x, df['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')    # 보라색
+    ax1.plot(x, df['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')    # 청록색
+    ax1.plot(x, df['MA120'], color='#84CC16', linewidth=2.0, alpha=0.9, label='MA120')  # 연두색
     
     # 메인 차트 설정
     ax1.set_title('Price Chart with Bollinger Bands and Moving Averages', fontsize=14, fontweight='bold')
@@ -305,11 +325,8 @@ def create_stock_chart(hist, stock_code):
     # 2. 거래량 차트 (두 번째 패널) - 웹 트레이딩 스타일 유지
     ax2 = axes[1]
     
-    # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색)
-    colors = ['#FF4444' if close >= open else '#4444FF' 
-              for close, open in zip(df['Close'], df['Open'])]
-    
-    ax2.bar(df.index, df['Volume'], color=colors, alpha=0.7, width=0.8)
+    # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색) - 캔들 색상 배열 재사용
+    ax2.bar(x, df['Volume'], color=candle_colors, alpha=0.7, width=0.8)
     ax2.set_title('Volume', fontsize=12, fontweight='bold')
     ax2.set_ylabel('Volume', fontsize=10, fontweight='bold')
     ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
@@ -320,14 +337,16 @@ def create_stock_chart(hist, stock_code):
     
     # 3. RSI 차트 (세 번째 패널) - 웹 트레이딩 스타일 유지
     ax3 = axes[2]
-    ax3.plot(df.index, df['RSI'], color='#8B5CF6', alpha=0.9, linewidth=2.0, label='RSI')
-    ax3.axhline(y=80, color='#EF4444', linestyle='--', alpha=0.8, linewidth=1.5, label='Overbought')
-    ax3.axhline(y=40, color='#10B981', linestyle='--', alpha=0.8, linewidth=1.5, label='Oversold')
-    ax3.axhline(y=60, color='#6B7280', linestyle='-', alpha=0.6, linewidth=1.0)
+    ax3.plot(x, df['RSI'], color='#8B5CF6', alpha=0.9, linewidth=2.0, label='RSI')
+    rsi_handles = add_threshold_lines(ax3, [
+        (80, '#EF4444', '--', 0.8, 1.5, 'Overbought'),
+        (40, '#10B981', '--', 0.8, 1.5, 'Oversold'),
+        (60, '#6B7280', '-', 0.6, 1.0, None),
+    ])
     ax3.set_title('RSI (Relative Strength Index)', fontsize=12, fontweight='bold')
     ax3.set_ylabel('RSI', fontsize=10, fontweight='bold')
     ax3.set_ylim(0, 100)
-    ax3.legend(fontsize=10, framealpha=0.9)
+    ax3.legend(handles=ax3.get_legend_handles_labels()[0] + rsi_handles, fontsize=10, framealpha=0.9)
     ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
     
     # Y축을 오른쪽으로 이동
@@ -336,10 +355,10 @@ def create_stock_chart(hist, stock_code):
     
     # 4. MACD 차트 (네 번째 패널) - 웹 트레이딩 스타일 유지
     ax4 = axes[3]
-    ax4.plot(df.index, df['MACD'], color='#3B82F6', linewidth=2.0, label='MACD')
-    ax4.plot(df.index, df['MACD_Signal'], color='#F59E0B', linewidth=2.0, label='Signal')
-    ax4.bar(df.index, df['MACD_Histogram'], color='#6B7280', alpha=0.6, width=0.8, label='Histogram')
-    ax4.axhline(y=0, color='#374151', linestyle='-', alpha=0.7, linewidth=1.0)
+    ax4.plot(x, df['MACD'], color='#3B82F6', linewidth=2.0, label='MACD')
+    ax4.plot(x, df['MACD_Signal'], color='#F59E0B', linewidth=2.0, label='Signal')
+    ax4.bar(x, df['MACD_Histogram'], color='#6B7280', alpha=0.6, width=0.8, label='Histogram')
+    add_threshold_lines(ax4, [(0, '#374151', '-', 0.7, 1.0, None)])
     ax4.set_title('MACD (12,26,9)', fontsize=12, fontweight='bold')
     ax4.legend(fontsize=10, framealpha=0.9)
     ax4.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
@@ -349,13 +368,13 @@ def create_stock_chart(hist, stock_code):
     ax4.yaxis.tick_right()
     
     # X축 날짜 설정 - 하단에만 표시
+    n = len(df)
+    tick_idx = [0, n//4, n//2, 3*n//4, n-1]
     for i, ax in enumerate(axes):
         if i == len(axes) - 1:  # 마지막 패널에만 날짜 표시
             # 날짜 인덱스에서 적절한 간격으로 날짜 선택
-            date_indices = [df.index[0], df.index[len(df)//4], df.index[len(df)//2], 
-                           df.index[3*len(df)//4], df.index[-1]]
-            ax.set_xticks(date_indices)
-            ax.set_xticklabels([date.strftime('%Y-%m') for date in date_indices], 
+            ax.set_xticks(x[tick_idx])
+            ax.set_xticklabels([df.index[j].strftime('%Y-%m') for j in tick_idx], 
                               rotation=45, ha='right', fontweight='bold')
         else:
             ax.set_xticks([])  # 다른 패널은 X축 눈금 숨김
@@ -402,7 +421,12 @@ def create_stock_chart(hist, stock_code):
         filepath = os.path.join(charts_dir, filename)
         version += 1
     
-    plt.savefig(filepath, dpi=150, bbox_inches='tight')
+    # tight bbox를 한 번만 계산해 전달 (savefig의 bbox 측정용 렌더링 생략)
+    renderer = fig.canvas.get_renderer()
+    bbox = fig.get_tightbbox(renderer).padded(plt.rcParams['savefig.pad_inches'])
+    # PNG는 zlib 압축 레벨 1로 저장 (파일이 약간 커지는 대신 인코딩 시간 단축, Agg 백엔드에서만 지원)
+    save_kwargs = {'pil_kwargs': {'compress_level': 1}} if matplotlib.get_backend().lower() == 'agg' else {}
+    plt.savefig(filepath, dpi=dpi, bbox_inches=bbox, **save_kwargs)
     print(f"💾 차트가 저장되었습니다: {filepath}")
     
     # 차트 뷰어를 띄우지 않고 차트 닫기
@@ -411,6 +435,14 @@ def create_stock_chart(hist, stock_code):
     # 차트 데이터 반환 (보조지표 포함)
     return filepath, df
 
+# JSON chart_data 항목에 담을 컬럼 (DataFrame 컬럼명 → JSON 키, 순서 유지)
+JSON_CHART_POINT_COLUMNS = {
+    'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume',
+    'MA5': 'ma5', 'MA20': 'ma20', 'MA60': 'ma60', 'MA120': 'ma120',
+    'BB_Upper': 'bb_upper', 'BB_Middle': 'bb_middle', 'BB_Lower': 'bb_lower',
+    'RSI': 'rsi', 'MACD': 'macd', 'MACD_Signal': 'macd_signal', 'MACD_Histogram': 'macd_histogram',
+}
+
 def save_chart_data_to_json(chart_data, stock_code, stock_name):
     """차트 데이터를 JSON으로 저장 - Gemini AI 최적화"""
     if chart_data is None or chart_data.empty:
@@ -488,46 +520,20 @@ def save_chart_data_to_json(chart_data, stock_code, stock_name):
         }
         
         # 차트 데이터 추가 (최근 30개 데이터만 - AI 분석에 충분)
+        # 행마다 dict를 만들지 않고 필요한 컬럼만 골라 한 번에 레코드 리스트로 변환
         recent_data = chart_data_clean.tail(30)
-        for date, row in recent_data.iterrows():
-            data_point = {
-                "date": date.strftime('%Y-%m-%d'),
-                "open": float(row['Open']),
-                "high": float(row['High']),
-                "low": float(row['Low']),
-                "close": float(row['Close']),
-                "volume": int(row['Volume'])
-            }
-            
-            # 기술적 지표 추가
-            if 'MA5' in row:
-                data_point["ma5"] = float(row['MA5'])
-            if 'MA20' in row:
-                data_point["ma20"] = float(row['MA20'])
-            if 'MA60' in row:
-                data_point["ma60"] = float(row['MA60'])
-            if 'MA120' in row:
-                data_point["ma120"] = float(row['MA120'])
-            if 'BB_Upper' in row:
-                data_point["bb_upper"] = float(row['BB_Upper'])
-            if 'BB_Middle' in row:
-                data_point["bb_middle"] = float(row['BB_Middle'])
-            if 'BB_Lower' in row:
-                data_point["bb_lower"] = float(row['BB_Lower'])
-            if 'RSI' in row:
-                data_point["rsi"] = float(row['RSI'])
-            if 'MACD' in row:
-                data_point["macd"] = float(row['MACD'])
-            if 'MACD_Signal' in row:
-                data_point["macd_signal"] = float(row['MACD_Signal'])
-            if 'MACD_Histogram' in row:
-                data_point["macd_histogram"] = float(row['MACD_Histogram'])
-            
-            json_data["chart_data"].append(data_point)
-        
-        # JSON 파일 저장
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        point_columns = {col: key for col, key in JSON_CHART_POINT_COLUMNS.items() if col in recent_data.columns}
+        points = recent_data[list(point_columns)].rename(columns=point_columns).astype({'volume': 'int64'})
+        points.insert(0, 'date', recent_data.index.strftime('%Y-%m-%d'))
+        json_data["chart_data"] = points.to_dict(orient='records')
+        
+        # JSON 파일 저장 (orjson이 있으면 사용 - NaN은 null로 저장됨)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
         
         print(f"💾 JSON 파일이 저장되었습니다: {filepath}")
         print(f"📊 데이터 구조:")
@@ -670,10 +676,14 @@ def save_chart_summary_to_text(chart_data, stock_code, stock_name):
 최근 10개 거래일 데이터:
 """
         
-        # 최근 10개 데이터 추가
+        # 최근 10개 데이터 추가 (행 단위 순회 없이 컬럼별 문자열 포맷 후 결합)
         recent_data = chart_data.tail(10)
-        for date, row in recent_data.iterrows():
-            summary_text += f"{date.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f} (거래량: {row['Volume']:,.0f})\n"
+        fmt_number = '{:,.0f}'.format
+        recent_lines = (recent_data.index.strftime('%Y-%m-%d') + ': '
+                        + recent_data['Open'].map(fmt_number) + ' → '
+                        + recent_data['Close'].map(fmt_number) + ' (거래량: '
+                        + recent_data['Volume'].map(fmt_number) + ')\n')
+        summary_text += ''.join(recent_lines)
         
         # 텍스트 파일 저장
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -4,9 +4,14 @@
 국내 주식 월봉 시세 조회 스크립트
 """
 
-# matplotlib 백엔드를 Agg로 설정 (tkinter 에러 방지)
+# matplotlib 백엔드 설정 (tkinter 에러 방지)
+# mplcairo가 설치되어 있으면 Cairo 백엔드로 더 빠르게 렌더링, 없으면 Agg 사용
 import matplotlib
-matplotlib.use('Agg')
+try:
+    import mplcairo
+    matplotlib.use('module://mplcairo.base')
+except ImportError:
+    matplotlib.use('Agg')
 
 import yfinance as yf
 import pandas as pd
@@ -14,7 +19,8 @@ import numpy as np
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
-import mplfinance as mpf
+# 일봉/주봉/월봉 공통 차트 그리기 함수
+from chart_common_module import add_threshold_lines
 import platform
 import os
 # openpyxl import 추가
@@ -22,6 +28,11 @@ import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 import json
+# orjson (선택 설치) - 있으면 JSON 저장에 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 운영체제별 한글 폰트 설정
 system = platform.system()
@@ -130,8 +141,12 @@ def get_monthly_stock_data(stock_code):
                 if not daily_hist.empty:
                     print(f"   ✅ Yahoo Finance 일봉: {daily_hist.index[0].strftime('%Y-%m-%d')} ~ {daily_hist.index[-1].strftime('%Y-%m-%d')}")
                     print(f"   📊 일봉 데이터 상세:")
-                    for i, (date, row) in enumerate(daily_hist.tail(5).iterrows()):
-                        print(f"      {date.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f}")
+                    # 행 단위 순회 없이 컬럼별 문자열 포맷 후 결합
+                    recent_daily = daily_hist.tail(5)
+                    fmt_number = '{:,.0f}'.format
+                    print('\n'.join('      ' + recent_daily.index.strftime('%Y-%m-%d') + ': '
+                                    + recent_daily['Open'].map(fmt_number) + ' → '
+                                    + recent_daily['Close'].map(fmt_number)))
                     
                     # 일봉을 월봉으로 변환
                     enhanced_monthly_data = convert_daily_to_monthly(daily_hist, yf_monthly_data)
@@ -182,83 +197,50 @@ def get_monthly_stock_data(stock_code):
 def convert_daily_to_monthly(daily_data, existing_monthly_data=None):
     """일봉 데이터를 월봉으로 변환 (미완성 월 포함)"""
     try:
-        # 일봉 데이터를 월별로 그룹화
-        daily_data_copy = daily_data.copy()
-        daily_data_copy.index.name = 'Date'
-        
         # 현재 날짜 확인
         current_date = datetime.now().date()
         
-        # 월별로 그룹화
-        daily_data_copy['Month'] = daily_data_copy.index.to_period('M')
-        
-        monthly_data = []
-        
-        for month, group in daily_data_copy.groupby('Month'):
-            if len(group) > 0:
-                # 월봉 데이터 계산
-                month_start = group.index[0]
-                
-                # 미완성 월인지 확인 (현재 월인 경우)
-                is_current_month = False
-                if hasattr(month_start, 'date'):
-                    month_start_date = month_start.date()
-                else:
-                    month_start_date = month_start
-                
-                # 현재 월인지 확인
-                current_month_start = current_date.replace(day=1)
-                if month_start_date.month == current_date.month and month_start_date.year == current_date.year:
-                    is_current_month = True
-                    print(f"   📅 현재 월 감지: {month_start_date.strftime('%Y-%m')}")
-                
-                # 현재 월인 경우 실제 마지막 거래일을 날짜로 사용
-                if is_current_month:
-                    # 현재 월의 실제 마지막 거래일 찾기
-                    last_trading_day = group.index[-1]
-                    actual_close = group['Close'].iloc[-1]
-                    print(f"      📅 현재 월 마지막 거래일: {last_trading_day.strftime('%Y-%m-%d')}, 종가: {actual_close:,.0f}")
-                    
-                    # 현재 월은 실제 마지막 거래일을 날짜로 사용
-                    monthly_data.append({
-                        'Date': last_trading_day,       # 실제 마지막 거래일
-                        'Open': group['Open'].iloc[0],  # 월 첫날 시가
-                        'High': group['High'].max(),    # 월 최고가
-                        'Low': group['Low'].min(),      # 월 최저가
-                        'Close': actual_close,          # 실제 마지막 거래일 종가
-                        'Volume': group['Volume'].sum(), # 월 총 거래량
-                        'IsCurrentMonth': is_current_month # 현재 월 여부
-                    })
-                else:
-                    # 완성된 월은 기존 방식
-                    monthly_data.append({
-                        'Date': month_start,
-                        'Open': group['Open'].iloc[0],      # 월 첫날 시가
-                        'High': group['High'].max(),        # 월 최고가
-                        'Low': group['Low'].min(),          # 월 최저가
-                        'Close': group['Close'].iloc[-1],   # 월 마지막날 종가
-                        'Volume': group['Volume'].sum(),    # 월 총 거래량
-                        'IsCurrentMonth': is_current_month  # 현재 월 여부
-                    })
-        
-        if not monthly_data:
+        # 월별 구간 계산 (날짜순 정렬 기준) - 월이 바뀌는 위치로 각 월의 시작/끝 행 번호를 구함
+        if not daily_data.index.is_monotonic_increasing:
+            daily_data = daily_data.sort_index()
+        index = daily_data.index
+        month_keys = index.year.to_numpy() * 12 + index.month.to_numpy()
+        if len(month_keys) == 0:
             print("   ❌ 월봉 데이터 변환에 실패했습니다.")
             return None
         
-        # 월봉 DataFrame 생성
-        monthly_df = pd.DataFrame(monthly_data)
-        monthly_df.set_index('Date', inplace=True)
-        monthly_df.sort_index(inplace=True)
+        boundaries = np.flatnonzero(np.diff(month_keys)) + 1
+        starts = np.concatenate(([0], boundaries))                  # 각 월 첫 거래일 위치
+        ends = np.concatenate((boundaries, [len(month_keys)])) - 1  # 각 월 마지막 거래일 위치
+        
+        # 월봉 OHLCV를 월 단위 배열로 한 번에 계산 (행마다 dict를 만들지 않음)
+        opens = daily_data['Open'].to_numpy()[starts]                           # 월 첫날 시가
+        highs = np.fmax.reduceat(daily_data['High'].to_numpy(), starts)         # 월 최고가
+        lows = np.fmin.reduceat(daily_data['Low'].to_numpy(), starts)           # 월 최저가
+        closes = daily_data['Close'].to_numpy()[ends]                           # 월 마지막날 종가
+        volumes = np.add.reduceat(np.nan_to_num(daily_data['Volume'].to_numpy()), starts)  # 월 총 거래량
+        
+        # 미완성 월인지 확인 (현재 월인 경우) - 현재 월은 실제 마지막 거래일을, 완성된 월은 첫 거래일을 날짜로 사용
+        is_current_month = month_keys[starts] == current_date.year * 12 + current_date.month
+        date_pos = np.where(is_current_month, ends, starts)
+        
+        monthly_df = pd.DataFrame(
+            {'Open': opens, 'High': highs, 'Low': lows, 'Close': closes, 'Volume': volumes},
+            index=index[date_pos].rename('Date'),
+        )
         
         # 현재 월이 있는지 확인
-        current_months = monthly_df[monthly_df['IsCurrentMonth'] == True]
-        if not current_months.empty:
+        if is_current_month.any():
+            current_months = monthly_df[is_current_month]
+            # 행 단위 순회 없이 컬럼별 문자열 포맷 후 결합
+            current_dates = current_months.index.strftime('%Y-%m-%d')
+            fmt_number = '{:,.0f}'.format
+            current_opens = current_months['Open'].map(fmt_number)
+            current_closes = current_months['Close'].map(fmt_number)
+            print('\n'.join('   📅 현재 월 감지: ' + current_months.index.strftime('%Y-%m')
+                            + '\n      📅 현재 월 마지막 거래일: ' + current_dates + ', 종가: ' + current_closes))
             print(f"   ✅ 현재 월 포함: {len(current_months)}개월")
-            for idx, row in current_months.iterrows():
-                print(f"      📅 {idx.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f}")
-        
-        # IsCurrentMonth 컬럼 제거 (분석에 불필요)
-        monthly_df = monthly_df.drop('IsCurrentMonth', axis=1)
+            print('\n'.join('      📅 ' + current_dates + ': ' + current_opens + ' → ' + current_closes))
         
         # 기존 월봉 데이터가 있는 경우 병합
         if existing_monthly_data is not None:
@@ -280,28 +262,30 @@ def convert_daily_to_monthly(daily_data, existing_monthly_data=None):
 def calculate_technical_indicators(df):
     """기술적 지표 계산"""
     print(f"   🔧 기술적 지표 계산 시작 (데이터 수: {len(df)}개월)")
+    close = df['Close']
+    cols = {}
     
     # 이동평균선 (월간 기준)
-    df['MA5'] = df['Close'].rolling(window=5).mean()
-    df['MA10'] = df['Close'].rolling(window=10).mean()
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    df['MA60'] = df['Close'].rolling(window=60).mean()
+    cols['MA5'] = close.rolling(window=5).mean().to_numpy()
+    cols['MA10'] = close.rolling(window=10).mean().to_numpy()
+    cols['MA20'] = close.rolling(window=20).mean().to_numpy()
+    cols['MA60'] = close.rolling(window=60).mean().to_numpy()
     
     # 볼린저 밴드 계산 (20개월 기준)
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    cols['BB_Middle'] = cols['MA20']
+    bb_std = close.rolling(window=20).std().to_numpy()
+    cols['BB_Upper'] = cols['BB_Middle'] + (bb_std * 2)
+    cols['BB_Lower'] = cols['BB_Middle'] - (bb_std * 2)
     
     # CCI (Commodity Channel Index) 계산
     # CCI = (Typical Price - SMA of Typical Price) / (0.015 * Mean Deviation)
     # Typical Price = (High + Low + Close) / 3
-    typical_price = (df['High'] + df['Low'] + df['Close']) / 3
+    typical_price = (df['High'] + df['Low'] + close) / 3
     sma_tp = typical_price.rolling(window=20).mean()
     
     # Mean Deviation 계산
     mean_deviation = typical_price.rolling(window=20).apply(lambda x: np.mean(np.abs(x - x.mean())))
-    df['CCI'] = (typical_price - sma_tp) / (0.015 * mean_deviation)
+    cols['CCI'] = ((typical_price - sma_tp) / (0.015 * mean_deviation)).to_numpy()
     
     # ADX (Average Directional Index) 계산
     print(f"   📊 ADX 계산 시작 (기간: {min(14, len(df) // 2)}개월)")
@@ -314,10 +298,10 @@ def calculate_technical_indicators(df):
     minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), -low_diff, 0)
     
     # True Range 계산
-    tr1 = df['High'] - df['Low']
-    tr2 = np.abs(df['High'] - df['Close'].shift(1))
-    tr3 = np.abs(df['Low'] - df['Close'].shift(1))
-    true_range = np.maximum(tr1, np.maximum(tr2, tr3))
+    high = df['High'].to_numpy()
+    low = df['Low'].to_numpy()
+    prev_close = close.shift(1).to_numpy()
+    true_range = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
     
     # 14기간 평균 계산 (월봉 데이터 특성을 고려하여 조정)
     period = min(14, len(df) // 2)  # 데이터가 적은 경우 기간 조정
@@ -326,58 +310,39 @@ def calculate_technical_indicators(df):
     
     print(f"   📊 ADX 계산 기간: {period}개월")
     
-    # ATR 계산 (0으로 나누기 방지)
-    atr = true_range.rolling(window=period).mean()
-    atr = atr.replace(0, np.nan)  # 0값을 NaN으로 변경
+    # ATR 계산 (0 또는 NaN인 구간은 아래에서 0으로 처리)
+    atr = pd.Series(true_range).rolling(window=period).mean().to_numpy()
     
     # +DI, -DI 계산 (0으로 나누기 방지)
-    plus_dm_avg = pd.Series(plus_dm).rolling(window=period).mean()
-    minus_dm_avg = pd.Series(minus_dm).rolling(window=period).mean()
-    
-    # pandas Series로 변환하여 계산
-    plus_di = pd.Series(index=df.index, dtype=float)
-    minus_di = pd.Series(index=df.index, dtype=float)
-    
-    # 0으로 나누기 방지하면서 계산
-    for i in range(len(df)):
-        if pd.notna(atr.iloc[i]) and atr.iloc[i] > 0:
-            plus_di.iloc[i] = (plus_dm_avg.iloc[i] / atr.iloc[i]) * 100
-            minus_di.iloc[i] = (minus_dm_avg.iloc[i] / atr.iloc[i]) * 100
-        else:
-            plus_di.iloc[i] = 0
-            minus_di.iloc[i] = 0
-    
-    # DX 계산 (0으로 나누기 방지)
-    dx = pd.Series(index=df.index, dtype=float)
-    
-    for i in range(len(df)):
-        di_sum = plus_di.iloc[i] + minus_di.iloc[i]
-        if di_sum > 0:
-            dx.iloc[i] = abs(plus_di.iloc[i] - minus_di.iloc[i]) / di_sum * 100
-        else:
-            dx.iloc[i] = 0
+    plus_dm_avg = pd.Series(plus_dm).rolling(window=period).mean().to_numpy()
+    minus_dm_avg = pd.Series(minus_dm).rolling(window=period).mean().to_numpy()
     
-    # ADX 계산 (DX의 평균)
-    df['ADX'] = pd.Series(dx).rolling(window=period).mean()
-    df['Plus_DI'] = plus_di
-    df['Minus_DI'] = minus_di
+    valid_atr = atr > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = np.where(valid_atr, (plus_dm_avg / atr) * 100, 0.0)
+        minus_di = np.where(valid_atr, (minus_dm_avg / atr) * 100, 0.0)
+        
+        # DX 계산 (0으로 나누기 방지)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, np.abs(plus_di - minus_di) / di_sum * 100, 0.0)
     
-    # NaN 값 처리
-    df['ADX'] = df['ADX'].fillna(0)
-    df['Plus_DI'] = df['Plus_DI'].fillna(0)
-    df['Minus_DI'] = df['Minus_DI'].fillna(0)
+    # ADX 계산 (DX의 평균), NaN 값은 0으로 처리
+    cols['ADX'] = pd.Series(dx).rolling(window=period).mean().fillna(0).to_numpy()
+    cols['Plus_DI'] = np.nan_to_num(plus_di, nan=0.0)
+    cols['Minus_DI'] = np.nan_to_num(minus_di, nan=0.0)
     
     # ADX 계산 결과 확인
-    valid_adx_count = df['ADX'].notna().sum()
+    valid_adx_count = int(np.count_nonzero(~np.isnan(cols['ADX'])))
     print(f"   ✅ ADX 계산 완료: {valid_adx_count}/{len(df)}개월 유효한 값")
     if valid_adx_count > 0:
-        print(f"   📊 최근 ADX 값: {df['ADX'].iloc[-1]:.1f}")
-        print(f"   📊 최근 +DI 값: {df['Plus_DI'].iloc[-1]:.1f}")
-        print(f"   📊 최근 -DI 값: {df['Minus_DI'].iloc[-1]:.1f}")
+        print(f"   📊 최근 ADX 값: {cols['ADX'][-1]:.1f}")
+        print(f"   📊 최근 +DI 값: {cols['Plus_DI'][-1]:.1f}")
+        print(f"   📊 최근 -DI 값: {cols['Minus_DI'][-1]:.1f}")
     else:
         print(f"   ⚠️ ADX 계산 실패: 모든 값이 NaN입니다")
     
-    return df
+    # 컬럼을 하나씩 추가하지 않고 한 번에 붙여 새 DataFrame 반환 (원본 df는 변경하지 않음)
+    return pd.concat([df, pd.DataFrame(cols, index=df.index)], axis=1)
 
 def analyze_monthly_stock_data(hist, stock_code):
     """주식 월봉 데이터 분석"""
@@ -414,7 +379,7 @@ def analyze_monthly_stock_data(hist, stock_code):
     print(f"   최소 월봉 거래량: {hist['Volume'].min():,.0f}주")
     
     # 기술적 지표 계산
-    df_with_indicators = calculate_technical_indicators(hist.copy())
+    df_with_indicators = calculate_technical_indicators(hist)
     
     # 기술적 지표 정보
     print(f"\n📊 기술적 지표 (최근값):")
@@ -457,7 +422,7 @@ def analyze_monthly_stock_data(hist, stock_code):
         else:
             print("   ADX 신호: 약한 추세 (추세 없음)")
 
-def create_monthly_stock_chart(hist, stock_code):
+def create_monthly_stock_chart(hist, stock_code, dpi=150):
     """주식 월봉 차트 생성 (캔들차트 + 보조지표) - test_overlay_chart.py 스타일 적용"""
     if hist is None or hist.empty:
         return None, None
@@ -465,9 +430,12 @@ def create_monthly_stock_chart(hist, stock_code):
     print(f"\n📈 월봉 캔들차트를 생성합니다...")
     
     # 기술적 지표 계산
-    df = calculate_technical_indicators(hist.copy())
+    df = calculate_technical_indicators(hist)
     df.index.name = 'Date'
     
+    # 월봉은 실제 날짜 간격이 필요 없으므로 정수 위치를 x좌표로 사용 (date2num 변환 생략)
+    x = np.arange(len(df))
+    
     # 차트 생성 (4개 패널: 메인차트, 거래량, CCI, ADX)
     fig, axes = plt.subplots(4, 1, figsize=(15, 16), height_ratios=[8, 2, 2, 2])
     fig.suptitle(f'{stock_code} Monthly Stock Chart (10 Years) - Image Reference Style', fontsize=16, fontweight='bold')
@@ -476,27 +444,26 @@ def create_monthly_stock_chart(hist, stock_code):
     ax1 = axes[0]
     
     # 볼린저 밴드 영역 채우기 (이미지 참고 - 오렌지/베이지 스타일)
-    ax1.fill_between(range(len(df)), df['BB_Upper'], df['BB_Lower'], 
+    ax1.fill_between(x, df['BB_Upper'], df['BB_Lower'], 
                      alpha=0.15, color='#FFE4B5', label='Bollinger Bands')
     
     # 볼린저 밴드 상단과 하단을 오렌지/베이지 색으로 표시 (범례에 표시하지 않음)
-    ax1.plot(range(len(df)), df['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
-    ax1.plot(range(len(df)), df['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+    ax1.plot(x, df['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+    ax1.plot(x, df['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
     
     # 캔들차트 그리기 (이미지 참고 - 빨간색/파란색)
-    for i, (date, row) in enumerate(df.iterrows()):
-        if row['Close'] >= row['Open']:  # 상승
-            color = '#FF4444'  # 빨간색
-        else:  # 하락
-            color = '#4444FF'  # 파란색
-        
-        ax1.plot([i, i], [row['Low'], row['High']], color=color, linewidth=1.0)
-        ax1.plot([i, i], [row['Open'], row['Close']], color=color, linewidth=3.0)
+    # 상승/하락 색상은 한 번의 배열 비교로 미리 계산 (거래량 차트에서도 재사용)
+    candle_colors = np.where(df['Close'].to_numpy() >= df['Open'].to_numpy(), '#FF4444', '#4444FF')  # 상승: 빨간색, 하락: 파란색
+    # iterrows() 대신 튜플로 순회 (행마다 Series를 만들지 않음)
+    ohlc = df[['Open', 'High', 'Low', 'Close']].itertuples(index=False, name=None)
+    for xi, color, (open_, high, low, close) in zip(x, candle_colors, ohlc):
+        ax1.plot([xi, xi], [low, high], color=color, linewidth=1.0)
+        ax1.plot([xi, xi], [open_, close], color=color, linewidth=3.0)
     
     # 이동평균선 추가 (웹 트레이딩 스타일 유지)
-    ax1.plot(range(len(df)), df['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')
-    ax1.plot(range(len(df)), df['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')
-    ax1.plot(range(len(df)), df['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')
+    ax1.plot(x, df['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')
+    ax1.plot(x, df['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')
+    ax1.plot(x, df['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')
     
     # 메인 차트 설정
     ax1.set_title('Price Chart with Moving Averages', fontsize=14, fontweight='bold')
@@ -511,11 +478,8 @@ def create_monthly_stock_chart(hist, stock_code):
     # 2. 거래량 차트 (두 번째 패널) - 웹 트레이딩 스타일 유지
     ax2 = axes[1]
     
-    # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색)
-    colors = ['#FF4444' if close >= open else '#4444FF' 
-              for close, open in zip(df['Close'], df['Open'])]
-    
-    ax2.bar(range(len(df)), df['Volume'], color=colors, alpha=0.7, width=0.8)
+    # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색) - 캔들 색상 배열 재사용
+    ax2.bar(x, df['Volume'], color=candle_colors, alpha=0.7, width=0.8)
     ax2.set_title('Volume', fontsize=12, fontweight='bold')
     ax2.set_ylabel('Volume', fontsize=10, fontweight='bold')
     ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
@@ -526,13 +490,15 @@ def create_monthly_stock_chart(hist, stock_code):
     
     # 3. CCI 차트 (세 번째 패널) - 웹 트레이딩 스타일 유지
     ax3 = axes[2]
-    ax3.plot(range(len(df)), df['CCI'], color='#3B82F6', linewidth=2.0, label='CCI')
-    ax3.axhline(y=100, color='#EF4444', linestyle='--', alpha=0.8, linewidth=1.5, label='Overbought')
-    ax3.axhline(y=-100, color='#10B981', linestyle='--', alpha=0.8, linewidth=1.5, label='Oversold')
-    ax3.axhline(y=0, color='#6B7280', linestyle='-', alpha=0.6, linewidth=1.0, label='Neutral')
+    ax3.plot(x, df['CCI'], color='#3B82F6', linewidth=2.0, label='CCI')
+    cci_handles = add_threshold_lines(ax3, [
+        (100, '#EF4444', '--', 0.8, 1.5, 'Overbought'),
+        (-100, '#10B981', '--', 0.8, 1.5, 'Oversold'),
+        (0, '#6B7280', '-', 0.6, 1.0, 'Neutral'),
+    ])
     ax3.set_title('CCI (Commodity Channel Index)', fontsize=12, fontweight='bold')
     ax3.set_ylabel('CCI', fontsize=10, fontweight='bold')
-    ax3.legend(fontsize=10, framealpha=0.9)
+    ax3.legend(handles=ax3.get_legend_handles_labels()[0] + cci_handles, fontsize=10, framealpha=0.9)
     ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
     
     # Y축을 오른쪽으로 이동
@@ -544,13 +510,13 @@ def create_monthly_stock_chart(hist, stock_code):
     
     # ADX 값이 유효한지 확인하고 플롯
     if not df['ADX'].isna().all() and not df['Plus_DI'].isna().all() and not df['Minus_DI'].isna().all():
-        ax4.plot(range(len(df)), df['ADX'], color='#8B5CF6', linewidth=2.5, label='ADX')
-        ax4.plot(range(len(df)), df['Plus_DI'], color='#10B981', linewidth=2.0, alpha=0.8, label='+DI')
-        ax4.plot(range(len(df)), df['Minus_DI'], color='#EF4444', linewidth=2.0, alpha=0.8, label='-DI')
-        ax4.axhline(y=25, color='#6B7280', linestyle='--', alpha=0.8, linewidth=1.5, label='Trend Threshold')
+        ax4.plot(x, df['ADX'], color='#8B5CF6', linewidth=2.5, label='ADX')
+        ax4.plot(x, df['Plus_DI'], color='#10B981', linewidth=2.0, alpha=0.8, label='+DI')
+        ax4.plot(x, df['Minus_DI'], color='#EF4444', linewidth=2.0, alpha=0.8, label='-DI')
+        adx_handles = add_threshold_lines(ax4, [(25, '#6B7280', '--', 0.8, 1.5, 'Trend Threshold')])
         ax4.set_title('ADX (Average Directional Index)', fontsize=12, fontweight='bold')
         ax4.set_ylabel('ADX/+DI/-DI', fontsize=10, fontweight='bold')
-        ax4.legend(fontsize=10, framealpha=0.9)
+        ax4.legend(handles=ax4.get_legend_handles_labels()[0] + adx_handles, fontsize=10, framealpha=0.9)
         ax4.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
     else:
         # ADX 데이터가 유효하지 않은 경우 메시지 표시
@@ -565,16 +531,13 @@ def create_monthly_stock_chart(hist, stock_code):
     ax4.yaxis.tick_right()
     
     # X축 날짜 설정 - 하단에만 표시
+    n = len(df)
+    tick_pos = [0, n//4, n//2, 3*n//4, n-1]
     for i, ax in enumerate(axes):
         if i == len(axes) - 1:  # 마지막 패널에만 날짜 표시
-            ax.set_xticks([0, len(df)//4, len(df)//2, 3*len(df)//4, len(df)-1])
-            ax.set_xticklabels([
-                df.index[0].strftime('%Y-%m'),
-                df.index[len(df)//4].strftime('%Y-%m'),
-                df.index[len(df)//2].strftime('%Y-%m'),
-                df.index[3*len(df)//4].strftime('%Y-%m'),
-                df.index[-1].strftime('%Y-%m')
-            ], rotation=45, ha='right', fontweight='bold')
+            ax.set_xticks(tick_pos)
+            ax.set_xticklabels([df.index[j].strftime('%Y-%m') for j in tick_pos],
+                              rotation=45, ha='right', fontweight='bold')
         else:
             ax.set_xticks([])  # 다른 패널은 X축 눈금 숨김
     
@@ -633,7 +596,12 @@ def create_monthly_stock_chart(hist, stock_code):
         version += 1
     
     # 차트 저장
-    plt.savefig(filepath, dpi=150, bbox_inches='tight')
+    # tight bbox를 한 번만 계산해 전달 (savefig의 bbox 측정용 렌더링 생략)
+    renderer = fig.canvas.get_renderer()
+    bbox = fig.get_tightbbox(renderer).padded(plt.rcParams['savefig.pad_inches'])
+    # PNG는 zlib 압축 레벨 1로 저장 (파일이 약간 커지는 대신 인코딩 시간 단축, Agg 백엔드에서만 지원)
+    save_kwargs = {'pil_kwargs': {'compress_level': 1}} if matplotlib.get_backend().lower() == 'agg' else {}
+    plt.savefig(filepath, dpi=dpi, bbox_inches=bbox, **save_kwargs)
     print(f"💾 차트가 저장되었습니다: {filepath}")
     
     # 차트 뷰어를 띄우지 않고 차트 닫기
@@ -642,6 +610,13 @@ def create_monthly_stock_chart(hist, stock_code):
     # 차트 데이터 반환 (보조지표 포함)
     return filepath, df
 
+# JSON chart_data 항목에 담을 컬럼 (DataFrame 컬럼명 → JSON 키, 순서 유지)
+JSON_CHART_POINT_COLUMNS = {
+    'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume',
+    'MA5': 'ma5', 'MA10': 'ma10', 'MA20': 'ma20', 'MA60': 'ma60',
+    'CCI': 'cci', 'ADX': 'adx', 'Plus_DI': 'plus_di', 'Minus_DI': 'minus_di',
+}
+
 def save_chart_data_to_json(chart_data, stock_code, stock_name):
     """차트 데이터를 JSON으로 저장 - Gemini AI 최적화"""
     if chart_data is None or chart_data.empty:
@@ -716,40 +691,20 @@ def save_chart_data_to_json(chart_data, stock_code, stock_name):
         }
         
         # 차트 데이터 추가 (최근 30개 데이터만 - AI 분석에 충분)
+        # 행마다 dict를 만들지 않고 필요한 컬럼만 골라 한 번에 레코드 리스트로 변환
         recent_data = chart_data_clean.tail(30)
-        for date, row in recent_data.iterrows():
-            data_point = {
-                "date": date.strftime('%Y-%m-%d'),
-                "open": float(row['Open']),
-                "high": float(row['High']),
-                "low": float(row['Low']),
-                "close": float(row['Close']),
-                "volume": int(row['Volume'])
-            }
-            
-            # 기술적 지표 추가
-            if 'MA5' in row:
-                data_point["ma5"] = float(row['MA5'])
-            if 'MA10' in row:
-                data_point["ma10"] = float(row['MA10'])
-            if 'MA20' in row:
-                data_point["ma20"] = float(row['MA20'])
-            if 'MA60' in row:
-                data_point["ma60"] = float(row['MA60'])
-            if 'CCI' in row:
-                data_point["cci"] = float(row['CCI'])
-            if 'ADX' in row:
-                data_point["adx"] = float(row['ADX'])
-            if 'Plus_DI' in row:
-                data_point["plus_di"] = float(row['Plus_DI'])
-            if 'Minus_DI' in row:
-                data_point["minus_di"] = float(row['Minus_DI'])
-            
-            json_data["chart_data"].append(data_point)
-        
-        # JSON 파일 저장
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        point_columns = {col: key for col, key in JSON_CHART_POINT_COLUMNS.items() if col in recent_data.columns}
+        points = recent_data[list(point_columns)].rename(columns=point_columns).astype({'volume': 'int64'})
+        points.insert(0, 'date', recent_data.index.strftime('%Y-%m-%d'))
+        json_data["chart_data"] = points.to_dict(orient='records')
+        
+        # JSON 파일 저장 (orjson이 있으면 사용 - NaN은 null로 저장됨)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
         
         print(f"💾 JSON 파일이 저장되었습니다: {filepath}")
         print(f"📊 데이터 구조:")
@@ -892,10 +847,14 @@ def save_chart_summary_to_text(chart_data, stock_code, stock_name):
 최근 10개 거래월 데이터:
 """
         
-        # 최근 10개 데이터 추가
+        # 최근 10개 데이터 추가 (행 단위 순회 없이 컬럼별 문자열 포맷 후 결합)
         recent_data = chart_data.tail(10)
-        for date, row in recent_data.iterrows():
-            summary_text += f"{date.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f} (거래량: {row['Volume']:,.0f})\n"
+        fmt_number = '{:,.0f}'.format
+        recent_lines = (recent_data.index.strftime('%Y-%m-%d') + ': '
+                        + recent_data['Open'].map(fmt_number) + ' → '
+                        + recent_data['Close'].map(fmt_number) + ' (거래량: '
+                        + recent_data['Volume'].map(fmt_number) + ')\n')
+        summary_text += ''.join(recent_lines)
         
         # 텍스트 파일 저장
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -5,27 +5,73 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 일시적 오류(429/5xx, 연결 실패)는 지수 백오프로 최대 3회 재시도
+# 재시도 후에도 실패하면 마지막 응답을 그대로 돌려받아 기존 'HTTP 상태코드' 오류 처리 유지
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET']),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# 모듈 전역 세션 - 요청마다 TCP/TLS 연결을 새로 맺지 않고 커넥션 풀을 재사용
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=RETRY))
+# 공통 요청 헤더 (gzip/deflate 압축 응답 요청 - requests가 자동으로 압축 해제)
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+})
+
+# 실시간 시세 응답 메모리 캐시 (종목코드 → (조회 시각, 결과))
+# 한 번의 실행 중 같은 종목을 반복 조회할 때 네트워크 요청 생략, 시세가 오래되지 않도록 짧은 유효시간 사용
+QUOTE_CACHE_SECONDS = 60
+_quote_cache = {}
+
+def _cache_get(cache, key, max_age):
+    """유효시간 안의 캐시 값 반환 (없거나 만료되었으면 None, 만료된 항목은 삭제)"""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    if time.monotonic() - cached[0] < max_age:
+        return cached[1]
+    cache.pop(key, None)
+    return None
+
+def _cache_put(cache, key, value, max_age):
+    """캐시에 값 저장 - 저장할 때 만료된 항목도 함께 삭제해 오래 실행되는 프로세스에서 캐시가 계속 커지지 않도록 함"""
+    now = time.monotonic()
+    for old_key, (stored_at, _) in list(cache.items()):
+        if now - stored_at >= max_age:
+            cache.pop(old_key, None)
+    cache[key] = (now, value)
 
 def get_naver_stock_data(stock_code):
     """네이버 금융에서 실시간 주식 데이터 조회"""
+    cached = _cache_get(_quote_cache, stock_code, QUOTE_CACHE_SECONDS)
+    if cached is not None:
+        return cached
+    
     try:
         # 네이버 금융 URL
         url = f"https://finance.naver.com/item/main.naver?code={stock_code}"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        response = SESSION.get(url, timeout=10)
         response.encoding = 'euc-kr'  # 네이버 금융 인코딩
         
         if response.status_code == 200:
@@ -76,7 +122,7 @@ def get_naver_stock_data(stock_code):
             else:
                 stock_name = f"종목{stock_code}"
             
-            return {
+            result = {
                 'success': True,
                 'stock_name': stock_name,
                 'current_price': current_price,
@@ -86,82 +132,118 @@ def get_naver_stock_data(stock_code):
                 'timestamp': datetime.now(),
                 'source': '네이버 금융'
             }
+            # 성공한 결과만 캐시 (실패는 다음 호출에서 다시 시도)
+            _cache_put(_quote_cache, stock_code, result, QUOTE_CACHE_SECONDS)
+            return result
         else:
             return {'success': False, 'error': f'HTTP {response.status_code}'}
             
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
+# 일봉 페이지 메모리 캐시 ((종목코드, 페이지) → (조회 시각, 결과))
+# 첫 페이지에는 장중 당일 시세가 포함되므로 실시간 시세와 같은 짧은 유효시간 사용
+DAILY_PAGE_CACHE_SECONDS = QUOTE_CACHE_SECONDS
+_daily_page_cache = {}
+
+def fetch_naver_daily_page(stock_code, page):
+    """네이버 금융 일봉 페이지 하나 조회 (페이지당 10거래일)"""
+    cache_key = (stock_code, page)
+    cached = _cache_get(_daily_page_cache, cache_key, DAILY_PAGE_CACHE_SECONDS)
+    if cached is not None:
+        return cached
+    
+    url = f"https://finance.naver.com/item/sise_day.naver?code={stock_code}&page={page}"
+    
+    # 네트워크 오류도 실패 결과로 반환 (여러 페이지 동시 조회 시 한 페이지 실패로 전체가 중단되지 않도록)
+    try:
+        response = SESSION.get(url, timeout=10)
+    except requests.RequestException as e:
+        return {'success': False, 'error': str(e)}
+    response.encoding = 'euc-kr'
+    
+    if response.status_code != 200:
+        return {'success': False, 'error': f'HTTP {response.status_code}'}
+    
+    soup = BeautifulSoup(response.text, 'html.parser')
+    
+    # 일봉 데이터 테이블 찾기
+    table = soup.select_one('table.type5')
+    if not table:
+        return {'success': False, 'error': '일봉 데이터 테이블을 찾을 수 없습니다'}
+    
+    # 데이터 추출
+    rows = table.select('tr')[1:]  # 헤더 제외
+    data = []
+    
+    for row in rows:
+        cols = row.select('td')
+        if len(cols) >= 7:
+            try:
+                date_str = cols[0].get_text().strip()
+                if date_str and date_str != '':
+                    # 날짜 파싱
+                    date = datetime.strptime(date_str, '%Y.%m.%d')
+                    
+                    # 가격 데이터 파싱
+                    close_price = int(cols[1].get_text().strip().replace(',', ''))
+                    change_amount = int(cols[2].get_text().strip().replace(',', ''))
+                    open_price = int(cols[3].get_text().strip().replace(',', ''))
+                    high_price = int(cols[4].get_text().strip().replace(',', ''))
+                    low_price = int(cols[5].get_text().strip().replace(',', ''))
+                    volume = int(cols[6].get_text().strip().replace(',', ''))
+                    
+                    data.append({
+                        'Date': date,
+                        'Close': close_price,
+                        'Change': change_amount,
+                        'Open': open_price,
+                        'High': high_price,
+                        'Low': low_price,
+                        'Volume': volume
+                    })
+            except (ValueError, IndexError):
+                continue
+    
+    result = {'success': True, 'data': data}
+    # 성공한 결과만 캐시 (실패는 다음 호출에서 다시 시도)
+    _cache_put(_daily_page_cache, cache_key, result, DAILY_PAGE_CACHE_SECONDS)
+    return result
+
 def get_naver_historical_data(stock_code, period_days=30):
     """네이버 금융에서 과거 데이터 조회 (일봉 기준)"""
     try:
-        # 네이버 금융 일봉 차트 URL
-        url = f"https://finance.naver.com/item/sise_day.naver?code={stock_code}&page=1"
+        # 일봉 페이지는 페이지당 10거래일 → 필요한 페이지 수만큼 동시에 조회 (페이지 순서는 유지)
+        page_count = max(1, -(-period_days // 10))
+        with ThreadPoolExecutor(max_workers=min(page_count, 8)) as executor:
+            page_results = list(executor.map(lambda page: fetch_naver_daily_page(stock_code, page),
+                                             range(1, page_count + 1)))
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        # 첫 페이지 실패 시 기존과 동일하게 오류 반환, 이후 페이지 실패는 건너뜀
+        if not page_results[0]['success']:
+            return page_results[0]
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.encoding = 'euc-kr'
+        data = []
+        seen_dates = set()
+        for result in page_results:
+            if not result['success']:
+                continue
+            for item in result['data']:
+                # 마지막 페이지를 넘으면 네이버가 마지막 페이지를 반복해서 보여주므로 날짜 중복 제거
+                if item['Date'] not in seen_dates:
+                    seen_dates.add(item['Date'])
+                    data.append(item)
+        data = data[:period_days]
         
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 일봉 데이터 테이블 찾기
-            table = soup.select_one('table.type5')
-            if not table:
-                return {'success': False, 'error': '일봉 데이터 테이블을 찾을 수 없습니다'}
-            
-            # 데이터 추출
-            rows = table.select('tr')[1:]  # 헤더 제외
-            data = []
-            
-            for row in rows:
-                cols = row.select('td')
-                if len(cols) >= 7:
-                    try:
-                        date_str = cols[0].get_text().strip()
-                        if date_str and date_str != '':
-                            # 날짜 파싱
-                            date = datetime.strptime(date_str, '%Y.%m.%d')
-                            
-                            # 가격 데이터 파싱
-                            close_price = int(cols[1].get_text().strip().replace(',', ''))
-                            change_amount = int(cols[2].get_text().strip().replace(',', ''))
-                            open_price = int(cols[3].get_text().strip().replace(',', ''))
-                            high_price = int(cols[4].get_text().strip().replace(',', ''))
-                            low_price = int(cols[5].get_text().strip().replace(',', ''))
-                            volume = int(cols[6].get_text().strip().replace(',', ''))
-                            
-                            data.append({
-                                'Date': date,
-                                'Close': close_price,
-                                'Change': change_amount,
-                                'Open': open_price,
-                                'High': high_price,
-                                'Low': low_price,
-                                'Volume': volume
-                            })
-                    except (ValueError, IndexError):
-                        continue
-            
-            if data:
-                return {
-                    'success': True,
-                    'data': data,
-                    'count': len(data),
-                    'source': '네이버 금융'
-                }
-            else:
-                return {'success': False, 'error': '유효한 데이터가 없습니다'}
+        if data:
+            return {
+                'success': True,
+                'data': data,
+                'count': len(data),
+                'source': '네이버 금융'
+            }
         else:
-            return {'success': False, 'error': f'HTTP {response.status_code}'}
+            return {'success': False, 'error': '유효한 데이터가 없습니다'}
             
     except Exception as e:
         return {'success': False, 'error': str(e)}
@@ -174,9 +256,19 @@ def compare_data_sources(stock_code):
     print(f"📅 현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 80)
     
+    def fetch_yahoo_history():
+        stock = yf.Ticker(f"{stock_code}.KS")
+        return stock.history(period="7d", interval="1d")
+    
+    # 네이버 금융 / Yahoo Finance 조회를 동시에 시작 (결과 출력은 기존 순서대로)
+    executor = ThreadPoolExecutor(max_workers=2)
+    naver_future = executor.submit(get_naver_stock_data, stock_code)
+    yahoo_future = executor.submit(fetch_yahoo_history)
+    executor.shutdown(wait=False)
+    
     # 네이버 금융 데이터 조회
     print("📊 네이버 금융 데이터 조회 중...")
-    naver_result = get_naver_stock_data(stock_code)
+    naver_result = naver_future.result()
     
     if naver_result['success']:
         print(f"✅ 네이버 금융:")
@@ -193,9 +285,7 @@ def compare_data_sources(stock_code):
     # Yahoo Finance 데이터 조회
     print("📊 Yahoo Finance 데이터 조회 중...")
     try:
-        ticker = f"{stock_code}.KS"
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="7d", interval="1d")
+        hist = yahoo_future.result()
         
         if not hist.empty:
             latest_date = hist.index[-1]
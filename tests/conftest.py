@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""pytest 공통 설정 및 테스트용 시세 데이터"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 저장소 루트의 분석 모듈을 import 할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_ohlcv(periods, freq='B', start='2024-01-02', seed=0):
+    """임의의 OHLCV 시세 DataFrame 생성 (yfinance history()와 같은 컬럼/시간대)"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq=freq, tz='Asia/Seoul', name='Date')
+    close = 50000 + np.cumsum(rng.normal(0, 500, periods)).round()
+    open_ = close + rng.normal(0, 300, periods).round()
+    high = np.maximum(open_, close) + rng.uniform(0, 400, periods).round()
+    low = np.minimum(open_, close) - rng.uniform(0, 400, periods).round()
+    volume = rng.integers(100000, 1000000, periods)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+@pytest.fixture
+def make_ohlcv():
+    """테스트용 시세 DataFrame 생성 함수"""
+    return _make_ohlcv
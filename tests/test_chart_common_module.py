@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""chart_common_module 테스트"""
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from chart_common_module import add_threshold_lines
+
+
+def test_add_threshold_lines_builds_one_collection():
+    """기준선들은 LineCollection 하나로 추가되고, 라벨이 있는 기준선만 범례 핸들을 반환해야 함"""
+    fig, ax = plt.subplots()
+    try:
+        handles = add_threshold_lines(ax, [
+            (80, '#EF4444', '--', 0.8, 1.5, 'Overbought (80)'),
+            (50, '#6B7280', '-', 0.5, 1.0, None),
+            (20, '#3B82F6', '--', 0.8, 1.5, 'Oversold (20)'),
+        ])
+        
+        assert len(ax.collections) == 1
+        hlines = ax.collections[0]
+        assert [segment[0][1] for segment in hlines.get_segments()] == [80, 50, 20]
+        assert hlines.get_colors()[1][3] == 0.5
+        assert [handle.get_label() for handle in handles] == ['Overbought (80)', 'Oversold (20)']
+        assert handles[0].get_linestyle() == '--'
+    finally:
+        plt.close(fig)
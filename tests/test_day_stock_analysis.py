@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""day_stock_analysis 테스트"""
+
+import numpy as np
+
+import day_stock_analysis as day
+
+
+def test_indicators_with_short_history(make_ohlcv):
+    """26일보다 짧은 데이터(신규 상장 등)에서도 MACD가 계산되어야 함"""
+    hist = make_ohlcv(20)
+    
+    df = day.calculate_technical_indicators(hist)
+    
+    assert len(df) == 20
+    for column in ['MACD', 'MACD_Signal', 'MACD_Histogram']:
+        assert np.isfinite(df[column]).all()
+    assert df['MA60'].isna().all()
+    assert np.isfinite(df['MA5'].iloc[4:]).all()
+
+
+def test_macd_matches_pandas_ewm(make_ohlcv):
+    """MACD/Signal은 pandas ewm(adjust=False)와 같은 값이어야 함"""
+    hist = make_ohlcv(20)
+    close = hist['Close']
+    
+    df = day.calculate_technical_indicators(hist)
+    
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    np.testing.assert_allclose(df['MACD'], macd)
+    np.testing.assert_allclose(df['MACD_Signal'], signal)
+
+
+def test_analyze_stock_data_with_short_history(make_ohlcv, capsys):
+    """짧은 데이터로도 분석 결과 출력이 끝까지 진행되어야 함"""
+    day.analyze_stock_data(make_ohlcv(20), '005930')
+    
+    assert 'MACD 신호' in capsys.readouterr().out
+
+
+def test_create_stock_chart_with_short_history(make_ohlcv, monkeypatch, tmp_path):
+    """짧은 데이터로도 차트가 저장되어야 함 (테스트는 dpi=100으로 빠르게 저장)"""
+    monkeypatch.chdir(tmp_path)
+    path, df = day.create_stock_chart(make_ohlcv(20), '005930', dpi=100)
+    
+    assert path is not None and path.endswith('.png')
+    assert len(df) == 20
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""month_stock_analysis 테스트"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import month_stock_analysis as month
+
+
+def _groupby_monthly(daily_data):
+    """기존 groupby 방식의 월봉 변환 (비교 기준) - 현재 월은 실제 마지막 거래일을 날짜로 사용"""
+    groups = daily_data.groupby(daily_data.index.tz_localize(None).to_period('M'))
+    monthly = groups.agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    first_dates = groups.apply(lambda group: group.index[0])
+    last_dates = groups.apply(lambda group: group.index[-1])
+    current_month = pd.Timestamp(datetime.now()).to_period('M')
+    monthly.index = pd.DatetimeIndex([last if period == current_month else first
+                                      for period, first, last in zip(monthly.index, first_dates, last_dates)], name='Date')
+    return monthly
+
+
+def test_convert_daily_to_monthly_matches_groupby(make_ohlcv):
+    """reduceat 기반 월봉 변환 결과가 기존 groupby 방식과 같아야 함 (현재 월, 결측 고가 포함)"""
+    daily = make_ohlcv(300)
+    daily.index = pd.bdate_range(end=pd.Timestamp(datetime.now().date()), periods=300, tz='Asia/Seoul', name='Date')
+    daily.iloc[5, daily.columns.get_loc('High')] = np.nan
+    
+    result = month.convert_daily_to_monthly(daily, None)
+    
+    expected = _groupby_monthly(daily)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_freq=False)
+
+
+def test_convert_daily_to_monthly_merges_existing(make_ohlcv):
+    """기존 월봉과 병합 시 겹치는 월은 새로 변환한 값을 사용해야 함"""
+    daily = make_ohlcv(60, start='2023-01-02')
+    existing = make_ohlcv(12, freq='MS', start='2022-04-01', seed=1)
+    
+    result = month.convert_daily_to_monthly(daily, existing)
+    
+    expected = _groupby_monthly(daily)
+    assert result.index.is_monotonic_increasing
+    assert not result.index.duplicated().any()
+    assert len(result) == len(existing.index.union(expected.index))
+    np.testing.assert_allclose(result.loc[result.index >= daily.index[0], 'Close'], expected['Close'])
+
+
+def test_indicators_with_short_history(make_ohlcv):
+    """MA60보다 짧은 월봉 데이터에서도 지표 계산이 끝까지 진행되어야 함"""
+    df = month.calculate_technical_indicators(make_ohlcv(20, freq='MS'))
+    
+    assert len(df) == 20
+    assert df['MA60'].isna().all()
+    assert np.isfinite(df['MA20'].iloc[-1])
+    assert np.isfinite(df[['ADX', 'Plus_DI', 'Minus_DI']]).all().all()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""naver_data_module 테스트"""
+
+from datetime import date, timedelta
+
+import pytest
+import requests
+
+import naver_data_module as naver
+
+
+class _Clock:
+    """time.monotonic 대체용 수동 시계"""
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_cache_get_returns_fresh_and_evicts_expired(monkeypatch):
+    """유효시간 안의 값은 반환하고, 만료된 값은 읽을 때 삭제해야 함"""
+    clock = _Clock()
+    monkeypatch.setattr(naver.time, 'monotonic', clock)
+    cache = {}
+    
+    naver._cache_put(cache, '005930', 'quote', 60)
+    clock.now += 59
+    assert naver._cache_get(cache, '005930', 60) == 'quote'
+    
+    clock.now += 1
+    assert naver._cache_get(cache, '005930', 60) is None
+    assert cache == {}
+
+
+def test_cache_put_evicts_expired_entries(monkeypatch):
+    """새 값을 저장할 때 만료된 다른 항목도 삭제되어 캐시가 계속 커지지 않아야 함"""
+    clock = _Clock()
+    monkeypatch.setattr(naver.time, 'monotonic', clock)
+    cache = {}
+    
+    for code in ['000001', '000002', '000003']:
+        naver._cache_put(cache, code, code, 60)
+    clock.now += 30
+    naver._cache_put(cache, '000004', '000004', 60)
+    clock.now += 30
+    naver._cache_put(cache, '000005', '000005', 60)
+    
+    assert sorted(cache) == ['000004', '000005']
+
+
+def test_get_naver_stock_data_uses_cache(monkeypatch):
+    """유효시간 안에 같은 종목을 다시 조회하면 네트워크 요청 없이 캐시를 반환해야 함"""
+    clock = _Clock()
+    monkeypatch.setattr(naver.time, 'monotonic', clock)
+    monkeypatch.setattr(naver, '_quote_cache', {})
+    cached = {'success': True, 'current_price': 70000}
+    naver._cache_put(naver._quote_cache, '005930', cached, naver.QUOTE_CACHE_SECONDS)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError('네트워크 요청이 발생했습니다')
+    monkeypatch.setattr(naver.SESSION, 'get', fail)
+    
+    assert naver.get_naver_stock_data('005930') is cached
+
+
+def test_fetch_naver_daily_page_refetches_after_expiry(monkeypatch):
+    """일봉 페이지 캐시는 만료되면 삭제되고 다시 조회해야 함"""
+    clock = _Clock()
+    monkeypatch.setattr(naver.time, 'monotonic', clock)
+    monkeypatch.setattr(naver, '_daily_page_cache', {})
+    requests_made = []
+    
+    class _Response:
+        status_code = 500
+        encoding = None
+    
+    def fake_get(url, timeout=None):
+        requests_made.append(url)
+        return _Response()
+    monkeypatch.setattr(naver.SESSION, 'get', fake_get)
+    
+    cached = {'success': True, 'data': []}
+    naver._cache_put(naver._daily_page_cache, ('005930', 1), cached, naver.DAILY_PAGE_CACHE_SECONDS)
+    assert naver.fetch_naver_daily_page('005930', 1) is cached
+    assert requests_made == []
+    
+    clock.now += naver.DAILY_PAGE_CACHE_SECONDS
+    assert naver.fetch_naver_daily_page('005930', 1) == {'success': False, 'error': 'HTTP 500'}
+    assert len(requests_made) == 1
+    assert naver._daily_page_cache == {}
+
+
+def _daily_page_html(first_day):
+    """네이버 일봉 페이지 형식의 HTML (first_day부터 하루씩 이전 날짜로 10거래일)"""
+    rows = ''.join(
+        f"<tr><td>{(first_day - timedelta(days=offset)).strftime('%Y.%m.%d')}</td>"
+        f"<td>70,{offset:03d}</td><td>100</td><td>69,900</td><td>70,500</td><td>69,500</td><td>1,234</td></tr>"
+        for offset in range(10))
+    return f'<table class="type5"><tr><th>날짜</th></tr>{rows}</table>'
+
+
+@pytest.fixture
+def naver_pages(monkeypatch):
+    """페이지 번호 → HTML(또는 예외) 응답을 돌려주는 가짜 SESSION.get 설치"""
+    monkeypatch.setattr(naver, '_daily_page_cache', {})
+    pages = {}
+    
+    class _Response:
+        status_code = 200
+        encoding = None
+        
+        def __init__(self, text):
+            self.text = text
+    
+    def fake_get(url, timeout=None):
+        page = pages[int(url.rsplit('page=', 1)[1])]
+        if isinstance(page, Exception):
+            raise page
+        return _Response(page)
+    monkeypatch.setattr(naver.SESSION, 'get', fake_get)
+    return pages
+
+
+def test_historical_data_skips_failing_later_page(naver_pages):
+    """두 번째 페이지에서 네트워크 오류가 나도 첫 페이지 데이터는 반환해야 함"""
+    naver_pages[1] = _daily_page_html(date(2024, 3, 29))
+    naver_pages[2] = requests.ConnectionError('boom')
+    
+    result = naver.get_naver_historical_data('005930', period_days=20)
+    
+    assert result['success']
+    assert result['count'] == 10
+    assert result['data'][0]['Date'].date() == date(2024, 3, 29)
+
+
+def test_historical_data_first_page_failure_returns_error(naver_pages):
+    """첫 페이지가 실패하면 기존과 같이 오류를 반환해야 함"""
+    naver_pages[1] = requests.ConnectionError('boom')
+    naver_pages[2] = _daily_page_html(date(2024, 3, 19))
+    
+    result = naver.get_naver_historical_data('005930', period_days=20)
+    
+    assert result == {'success': False, 'error': 'boom'}
+
+
+def test_historical_data_drops_repeated_pages_and_trims(naver_pages):
+    """마지막 페이지를 넘겨 반복된 날짜는 한 번만 넣고, period_days개로 잘라야 함"""
+    naver_pages[1] = _daily_page_html(date(2024, 3, 29))
+    naver_pages[2] = _daily_page_html(date(2024, 3, 19))
+    naver_pages[3] = naver_pages[2]  # 마지막 페이지 이후에는 마지막 페이지가 반복됨
+    
+    result = naver.get_naver_historical_data('005930', period_days=30)
+    dates = [item['Date'] for item in result['data']]
+    assert result['count'] == 20
+    assert len(set(dates)) == 20
+    assert dates == sorted(dates, reverse=True)
+    
+    naver_pages.clear()
+    naver_pages.update({1: _daily_page_html(date(2024, 3, 29)), 2: _daily_page_html(date(2024, 3, 19))})
+    result = naver.get_naver_historical_data('005930', period_days=15)
+    assert result['count'] == 15
+    assert result['data'][-1]['Date'].date() == date(2024, 3, 15)
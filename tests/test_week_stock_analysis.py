@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""week_stock_analysis 테스트"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import week_stock_analysis as week
+
+
+@pytest.fixture
+def weekly_chart_data(make_ohlcv):
+    """지표가 포함된 주봉 차트 데이터"""
+    return week.calculate_technical_indicators(make_ohlcv(80, freq='W-MON'))
+
+
+def test_save_chart_data_to_parquet_round_trip(weekly_chart_data, monkeypatch, tmp_path):
+    """Parquet 저장 후 다시 읽으면 날짜/가격/거래량이 유지되어야 함"""
+    pytest.importorskip('pyarrow')
+    monkeypatch.chdir(tmp_path)
+    
+    path = week.save_chart_data_to_parquet(weekly_chart_data, '005930', 'Test Corp', date_tag='20240101')
+    
+    assert path.endswith('weekly_Test_Corp_005930_20240101.parquet')
+    loaded = pd.read_parquet(path)
+    assert list(loaded.columns) == ['Date'] + list(weekly_chart_data.columns)
+    assert (loaded['Date'].to_numpy() == weekly_chart_data.index.to_numpy()).all()
+    np.testing.assert_array_equal(loaded['Volume'], weekly_chart_data['Volume'])
+    np.testing.assert_allclose(loaded['Close'], weekly_chart_data['Close'], rtol=1e-6)
+
+
+def test_save_chart_data_to_parquet_without_pyarrow(weekly_chart_data, monkeypatch, tmp_path):
+    """pyarrow가 없으면 저장하지 않고, 빈 저장 폴더도 만들지 않아야 함"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(week, 'pa', None)
+    
+    assert week.save_chart_data_to_parquet(weekly_chart_data, '005930', 'Test Corp') is None
+    assert list(tmp_path.iterdir()) == []
+
+
+class _FakeTicker:
+    """history() 호출 횟수를 세는 yf.Ticker 대체 객체"""
+    frame = None
+    calls = 0
+    
+    def __init__(self, ticker):
+        self.ticker = ticker
+    
+    def history(self, period=None, interval=None, **kwargs):
+        _FakeTicker.calls += 1
+        hist = self.frame.copy()
+        hist['Dividends'] = 0.0
+        hist['Stock Splits'] = 0.0
+        return hist
+
+
+def test_cached_history_round_trip_and_ttl(make_ohlcv, monkeypatch, tmp_path):
+    """캐시는 같은 데이터를 돌려주고, 유효 시간이 지나면 다시 조회해야 함"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(_FakeTicker, 'frame', make_ohlcv(30, freq='W-MON'))
+    monkeypatch.setattr(_FakeTicker, 'calls', 0)
+    monkeypatch.setattr(week.yf, 'Ticker', _FakeTicker)
+    
+    first = week._cached_history('005930.KS', '5y', '1wk')
+    second = week._cached_history('005930.KS', '5y', '1wk')
+    
+    assert _FakeTicker.calls == 1
+    assert first.index.tz is None
+    pd.testing.assert_frame_equal(second, first, check_freq=False)
+    assert not list(tmp_path.joinpath(week.YF_CACHE_DIR).glob('*.pkl'))
+    
+    monkeypatch.setattr(week, 'YF_CACHE_TTL_SECONDS', 0)
+    week._cached_history('005930.KS', '5y', '1wk')
+    assert _FakeTicker.calls == 2
+
+
+def test_text_summary_recent_weeks_use_line_format(weekly_chart_data, monkeypatch, tmp_path):
+    """최근 10주 데이터는 일봉/월봉 요약과 같은 '날짜: 시가 → 종가 (거래량: n)' 줄 형식이어야 함"""
+    monkeypatch.chdir(tmp_path)
+    path = week.save_chart_summary_to_text(weekly_chart_data, '005930', 'Test Corp', date_tag='20240101')
+    
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    
+    recent_lines = lines[lines.index('최근 10개 거래주 데이터:') + 1:]
+    assert len(recent_lines) == 10
+    last = weekly_chart_data.iloc[-1]
+    assert recent_lines[-1] == (f"{weekly_chart_data.index[-1].strftime('%Y-%m-%d')}: {last['Open']:,.0f} → "
+                                f"{last['Close']:,.0f} (거래량: {last['Volume']:,.0f})")
+
+
+def test_indicators_with_short_history(make_ohlcv):
+    """60주보다 짧은 데이터(신규 상장 등)에서도 지표가 계산되어야 함 (bottleneck 설치 여부와 무관)"""
+    hist = make_ohlcv(20, freq='W-MON')
+    
+    df = week.calculate_technical_indicators(hist)
+    
+    assert len(df) == 20
+    assert df['MA60'].isna().all()
+    np.testing.assert_allclose(df['MA20'].iloc[-1], hist['Close'].mean())
+    np.testing.assert_allclose(df['MA5'], hist['Close'].rolling(5).mean())
+    assert np.isfinite(df['Stoch_D'].iloc[-1])
+
+
+@pytest.mark.parametrize('use_orjson', [True, False], ids=['orjson', 'json'])
+def test_save_chart_data_to_json_is_valid_json(weekly_chart_data, monkeypatch, tmp_path, use_orjson):
+    """구조 + chart_data 배열을 이어 붙여 쓴 JSON 파일이 올바르게 읽히고 값이 유지되어야 함"""
+    monkeypatch.chdir(tmp_path)
+    if use_orjson and week.orjson is None:
+        pytest.skip('orjson이 설치되어 있지 않습니다')
+    if not use_orjson:
+        monkeypatch.setattr(week, 'orjson', None)
+    
+    path = week.save_chart_data_to_json(weekly_chart_data, '005930', '테스트', date_tag='20240101')
+    
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    
+    assert list(data) == ['metadata', 'summary', 'technical_indicators', 'chart_data']
+    assert data['metadata']['stock_name'] == '테스트'
+    assert data['metadata']['total_records'] == len(weekly_chart_data)
+    
+    latest = weekly_chart_data.iloc[-1]
+    assert data['summary']['latest_close'] == pytest.approx(latest['Close'])
+    assert data['technical_indicators']['latest_values']['ma60'] == pytest.approx(latest['MA60'])
+    
+    points = data['chart_data']
+    assert len(points) == 30
+    assert points[-1]['date'] == weekly_chart_data.index[-1].strftime('%Y-%m-%d')
+    assert points[-1]['close'] == pytest.approx(latest['Close'])
+    assert points[-1]['volume'] == latest['Volume']
+    assert list(points[-1]) == ['date'] + list(week.JSON_CHART_POINT_COLUMNS.values())
+
+
+def test_unique_path_picks_next_version(tmp_path):
+    """폴더가 없으면 만들고, 같은 이름이 없으면 그대로, 있으면 기존 최대 버전 + 1을 붙여야 함 (다른 종목/확장자 파일은 무시)"""
+    directory = tmp_path / 'chart_data_json'
+    filename = 'weekly_Test[1]_005930_20240101.json'
+    
+    assert week._unique_path(str(directory), filename) == str(directory / filename)
+    assert directory.is_dir()
+    
+    (directory / filename).touch()
+    assert week._unique_path(str(directory), filename) == str(directory / 'weekly_Test[1]_005930_20240101_v1.json')
+    
+    for name in ['weekly_Test[1]_005930_20240101_v1.json', 'weekly_Test[1]_005930_20240101_v7.json',
+                 'weekly_Test[1]_005930_20240101_v9.csv', 'weekly_Test[1]_005930_20240101_vx.json',
+                 'weekly_Test[1]_000660_20240101_v12.json']:
+        (directory / name).touch()
+    assert week._unique_path(str(directory), filename) == str(directory / 'weekly_Test[1]_005930_20240101_v8.json')
+
+
+def _calendar_weekly(daily_data):
+    """월~일 달력 주 기준 groupby 주봉 (비교 기준) - 라벨은 해당 주 월요일 (Yahoo Finance 1wk와 동일)"""
+    mondays = daily_data.index.normalize() - pd.to_timedelta(daily_data.index.weekday, unit='D')
+    weekly = daily_data.groupby(mondays).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                              'Volume': 'sum'})
+    weekly.index.name = 'Date'
+    return weekly
+
+
+def _daily_frame(make_ohlcv, index):
+    """주어진 날짜 인덱스의 일봉 데이터 (조회 직후처럼 시간대 정보 없음)"""
+    return make_ohlcv(len(index)).set_axis(index)
+
+
+def _no_naver():
+    return {'success': False, 'error': 'offline'}
+
+
+def test_convert_daily_to_weekly_skips_holiday_week(make_ohlcv):
+    """완성된 주는 월~일 단위로 묶여 월요일 라벨을 쓰고, 거래일이 없는 주는 빠져야 함"""
+    days = pd.bdate_range('2024-01-01', '2024-03-29', name='Date')
+    # 2/12~2/16 한 주 전체 휴장, 2/19(월) 하루 휴장
+    days = days[~((days >= '2024-02-12') & (days <= '2024-02-16')) & (days != '2024-02-19')]
+    daily = _daily_frame(make_ohlcv, days)
+    
+    result = week.convert_daily_to_weekly(daily, None, fetch_naver=_no_naver)
+    
+    pd.testing.assert_frame_equal(result, _calendar_weekly(daily), check_dtype=False, check_freq=False)
+    assert pd.Timestamp('2024-02-12') not in result.index
+    # 월요일이 휴장이어도 라벨은 월요일 (예전 Tue~Mon 묶음은 첫 거래일인 화요일을 라벨로 사용)
+    assert pd.Timestamp('2024-02-19') in result.index
+    assert result.loc['2024-02-19', 'Open'] == daily.loc['2024-02-20', 'Open']
+
+
+def test_convert_daily_to_weekly_relabels_current_week(make_ohlcv):
+    """현재 주는 실제 마지막 거래일을 날짜로 쓰고, 네이버 실시간 가격을 종가로 사용해야 함"""
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30, name='Date')
+    daily = _daily_frame(make_ohlcv, days)
+    
+    result = week.convert_daily_to_weekly(daily, None,
+                                          fetch_naver=lambda: {'success': True, 'current_price': 12345})
+    
+    expected = _calendar_weekly(daily)
+    assert result.index[-1] == days[-1]
+    assert result['Close'].iloc[-1] == 12345
+    pd.testing.assert_series_equal(result.iloc[-1].drop('Close'), expected.iloc[-1].drop('Close'),
+                                   check_dtype=False, check_names=False)
+    pd.testing.assert_frame_equal(result.iloc[:-1], expected.iloc[:-1], check_dtype=False, check_freq=False)
+
+
+def test_convert_daily_to_weekly_replaces_existing_weeks(make_ohlcv):
+    """Yahoo 1wk 주봉과 병합하면 겹치는 주(현재 주 포함)는 새 값으로 바뀌고 중복되지 않아야 함"""
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=30, name='Date')
+    daily = _daily_frame(make_ohlcv, days)
+    current_monday = days[-1] - pd.Timedelta(days=days[-1].weekday())
+    existing = make_ohlcv(20, seed=1).set_axis(pd.date_range(end=current_monday, periods=20, freq='W-MON', name='Date'))
+    
+    result = week.convert_daily_to_weekly(daily, existing, fetch_naver=_no_naver)
+    
+    mondays = result.index.normalize() - pd.to_timedelta(result.index.weekday, unit='D')
+    assert not mondays.duplicated().any()
+    assert len(result) == len(existing)
+    assert result.index.is_monotonic_increasing
+    
+    new_weeks = _calendar_weekly(daily)
+    completed = new_weeks.iloc[:-1]
+    pd.testing.assert_frame_equal(result.loc[completed.index], completed, check_dtype=False, check_freq=False)
+    untouched = existing.index[existing.index < new_weeks.index[0]]
+    pd.testing.assert_frame_equal(result.loc[untouched], existing.loc[untouched, result.columns], check_dtype=False,
+                                  check_freq=False)
+
+
+class _FakeStock:
+    """history()가 항상 같은 일봉을 돌려주는 yf.Ticker 대체 객체"""
+    def __init__(self, daily):
+        self.daily = daily
+    
+    def history(self, **kwargs):
+        return self.daily
+
+
+def _patch_weekly_sources(monkeypatch, make_ohlcv, daily_end):
+    """Yahoo 주봉/일봉과 네이버 실시간 시세를 가짜로 바꾸고, 네이버 조회 횟수 목록을 반환"""
+    import naver_data_module
+    
+    daily = _daily_frame(make_ohlcv, pd.bdate_range(end=daily_end, periods=30, name='Date'))
+    weekly = make_ohlcv(20, seed=1).set_axis(pd.date_range(end=daily.index[0], periods=20, freq='W-MON', name='Date'))
+    monkeypatch.setattr(week, '_fetch_first_history',
+                        lambda tickers, period, interval: (tickers[0], _FakeStock(daily), weekly))
+    
+    naver_calls = []
+    
+    def fake_naver(stock_code):
+        naver_calls.append(stock_code)
+        return {'success': True, 'stock_name': '테스트', 'current_price': 12345, 'change_direction': '상승',
+                'change_amount': 100, 'timestamp': datetime.now()}
+    monkeypatch.setattr(naver_data_module, 'get_naver_stock_data', fake_naver)
+    return naver_calls
+
+
+def test_get_weekly_stock_data_prints_naver_quote_once(make_ohlcv, monkeypatch, capsys):
+    """기본 실행은 예전처럼 네이버 실시간 시세를 출력하고, 현재 주 보완에는 같은 결과를 재사용해야 함"""
+    naver_calls = _patch_weekly_sources(monkeypatch, make_ohlcv, pd.Timestamp.today().normalize())
+    
+    result = week.get_weekly_stock_data('005930')
+    
+    assert '📈 현재가: 12,345원' in capsys.readouterr().out
+    assert naver_calls == ['005930']
+    assert result['Close'].iloc[-1] == 12345
+
+
+def test_get_weekly_stock_data_quiet_skips_naver_for_past_data(make_ohlcv, monkeypatch, capsys):
+    """verbose=False이고 일봉이 현재 주까지 오지 않으면 네이버를 조회하지 않아야 함"""
+    naver_calls = _patch_weekly_sources(monkeypatch, make_ohlcv, pd.Timestamp('2024-03-29'))
+    
+    result = week.get_weekly_stock_data('005930', verbose=False)
+    
+    assert '현재가' not in capsys.readouterr().out
+    assert naver_calls == []
+    assert result is not None
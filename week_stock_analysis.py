@@ -4,113 +4,221 @@
 국내 주식 주봉 시세 조회 스크립트
 """
 
-# matplotlib 백엔드를 Agg로 설정 (tkinter 에러 방지)
+# matplotlib 백엔드 설정 (tkinter 에러 방지)
+# mplcairo가 설치되어 있으면 Cairo 백엔드로 더 빠르게 렌더링, 없으면 Agg 사용
 import matplotlib
-matplotlib.use('Agg')
+try:
+    import mplcairo
+    matplotlib.use('module://mplcairo.base')
+except ImportError:
+    matplotlib.use('Agg')
 
 import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import matplotlib.font_manager as fm
-import mplfinance as mpf
+from matplotlib.collections import LineCollection
+# 일봉/주봉/월봉 공통 차트 그리기 함수
+from chart_common_module import add_threshold_lines
 import platform
 import os
+import time
+import glob
+import re
 # openpyxl import 추가
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 import json
+import csv
+from functools import lru_cache
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# orjson (선택 설치) - 있으면 JSON 저장에 사용
+try:
+    import orjson
+except ImportError:
+    orjson = None
+# pyarrow (선택 설치) - 있으면 CSV 저장에 PyArrow CSV writer 사용
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+# bottleneck (선택 설치) - 있으면 이동 창(rolling) 계산에 사용
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+# tsdownsample (선택 설치) - 있으면 긴 시계열의 보조지표 선을 LTTB로 다운샘플링
+try:
+    from tsdownsample import LTTBDownsampler
+except ImportError:
+    LTTBDownsampler = None
+
+# 닫히지 않은 figure가 쌓이면 바로 경고 (일괄 실행 시 메모리 누수 감지용)
+plt.rcParams['figure.max_open_warning'] = 5
 
-# 운영체제별 한글 폰트 설정
-system = platform.system()
-if system == 'Windows':
-    # Windows 환경
-    font_list = ['Malgun Gothic', '맑은 고딕', 'NanumGothic', '나눔고딕']
-elif system == 'Darwin':  # macOS
-    font_list = ['AppleGothic', 'NanumGothic', '나눔고딕']
-else:  # Linux
-    font_list = ['NanumGothic', '나눔고딕', 'DejaVu Sans']
+# 저장 폴더 (처음 저장할 때 _unique_path에서 생성)
+OUTPUT_DIRS = {
+    'chart': 'weekly_charts',
+    'json': 'chart_data_json',
+    'csv': 'chart_data_csv',
+    'text': 'chart_data_text',
+    'parquet': 'chart_data_parquet',
+}
 
-# 사용 가능한 폰트 찾기
-available_font = None
-for font in font_list:
+@lru_cache(maxsize=1)
+def _configure_korean_font():
+    """운영체제별 한글 폰트 설정 (프로세스당 한 번만 실행)"""
+    system = platform.system()
+    if system == 'Windows':
+        # Windows 환경
+        font_list = ['Malgun Gothic', '맑은 고딕', 'NanumGothic', '나눔고딕']
+    elif system == 'Darwin':  # macOS
+        font_list = ['AppleGothic', 'NanumGothic', '나눔고딕']
+    else:  # Linux
+        font_list = ['NanumGothic', '나눔고딕', 'DejaVu Sans']
+    
+    # 사용 가능한 폰트 찾기 - 이미 로드된 폰트 목록에서 확인 (findfont는 없는 폰트도 대체 폰트로 반환하고 디스크 탐색을 함)
+    installed_fonts = {font.name for font in fm.fontManager.ttflist}
+    available_font = next((font for font in font_list if font in installed_fonts), None)
+    
+    if available_font:
+        plt.rcParams['font.family'] = available_font
+        print(f"✅ 사용 폰트: {available_font}")
+    else:
+        # 기본 폰트 사용
+        plt.rcParams['font.family'] = 'DejaVu Sans'
+        print("⚠️ 한글 폰트를 찾을 수 없어 기본 폰트를 사용합니다.")
+    
+    plt.rcParams['axes.unicode_minus'] = False
+    return available_font
+
+# 운영체제별 한글 폰트 설정 (matplotlib이 폰트 캐시를 관리하므로 별도 재구축 불필요)
+_configure_korean_font()
+
+# Yahoo Finance 시세 디스크 캐시 (짧은 시간 안에 재실행 시 네트워크 조회 생략)
+YF_CACHE_DIR = ".yf_cache"
+YF_CACHE_MAX_AGE_DAYS = 3
+# 캐시 유효 시간 (장중에는 현재 주 시세가 계속 바뀌므로 짧게 유지)
+YF_CACHE_TTL_SECONDS = 600
+
+def _prune_yf_cache():
+    """유효기간이 지난 시세 캐시 파일 삭제"""
+    cutoff = time.time() - YF_CACHE_MAX_AGE_DAYS * 86400
     try:
-        fm.findfont(font)
-        available_font = font
-        break
-    except:
-        continue
+        with os.scandir(YF_CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+    except OSError:
+        pass
 
-if available_font:
-    plt.rcParams['font.family'] = available_font
-    print(f"✅ 사용 폰트: {available_font}")
-else:
-    # 기본 폰트 사용
-    plt.rcParams['font.family'] = 'DejaVu Sans'
-    print("⚠️ 한글 폰트를 찾을 수 없어 기본 폰트를 사용합니다.")
+def _drop_timezone(hist):
+    """조회 직후 DatetimeIndex의 시간대 정보를 한 번에 제거 (현지 시각 기준 유지)"""
+    if isinstance(hist.index, pd.DatetimeIndex) and hist.index.tz is not None:
+        hist.index = hist.index.tz_localize(None)
+    return hist
 
-plt.rcParams['axes.unicode_minus'] = False
+def _cached_history(ticker, period, interval):
+    """yf.Ticker(ticker).history(period, interval) 결과를 (티커, 기간, 간격, 날짜) 단위로 YF_CACHE_TTL_SECONDS 동안 CSV로 캐시"""
+    # 캐시는 실행 코드가 담길 수 없는 CSV로 저장 (pickle은 읽을 때 임의 코드가 실행될 수 있음)
+    cache_path = os.path.join(YF_CACHE_DIR, f"{ticker}_{period}_{interval}_{datetime.now().strftime('%Y%m%d')}.csv")
+    try:
+        if time.time() - os.path.getmtime(cache_path) < YF_CACHE_TTL_SECONDS:
+            return pd.read_csv(cache_path, index_col='Date', parse_dates=['Date'])
+    except Exception:
+        pass  # 캐시가 없거나 손상되었으면 다시 조회
+    
+    hist = _drop_timezone(yf.Ticker(ticker).history(period=period, interval=interval))
+    
+    # 빈 결과는 일시적 오류일 수 있으므로 캐시하지 않음
+    if not hist.empty:
+        try:
+            os.makedirs(YF_CACHE_DIR, exist_ok=True)
+            _prune_yf_cache()
+            hist.to_csv(cache_path, index_label='Date')
+        except Exception as e:
+            print(f"   ⚠️ 시세 캐시 저장 실패: {e}")
+    return hist
 
-# 폰트 캐시 재설정
-try:
-    fm._rebuild()
-except AttributeError:
-    # 최신 matplotlib 버전에서는 _rebuild가 제거됨
-    fm.findfont('DejaVu Sans', rebuild_if_missing=True)
+def _fetch_first_history(tickers, period, interval):
+    """여러 티커(코스피/코스닥)를 동시에 조회해 먼저 데이터가 확인된 (티커, Ticker 객체, 데이터) 반환"""
+    def fetch(ticker):
+        return yf.Ticker(ticker), _cached_history(ticker, period, interval)
+    
+    executor = ThreadPoolExecutor(max_workers=len(tickers))
+    futures = {executor.submit(fetch, ticker): ticker for ticker in tickers}
+    try:
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                stock, hist = future.result()
+            except Exception as e:
+                print(f"   ❌ {ticker} 시도 실패: {str(e)[:50]}...")
+                continue
+            if not hist.empty:
+                return ticker, stock, hist
+    finally:
+        # 남은 조회는 기다리지 않음 (이미 시작된 요청은 백그라운드에서 종료)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+    
+    return None, None, None
 
-def get_weekly_stock_data(stock_code):
-    """국내 주식 주봉 데이터 조회 (5년) - 네이버 금융 우선, Yahoo Finance 보조"""
+def get_weekly_stock_data(stock_code, verbose=True):
+    """국내 주식 주봉 데이터 조회 (5년) - Yahoo Finance 기본, 현재 주는 네이버 금융 실시간 시세로 보완
+    
+    verbose=False이면 시작 시 네이버 실시간 시세 출력을 생략하고, 현재 주 보완이 필요할 때만 조회
+    """
     print(f"🔍 {stock_code} 5년 주봉 시세 조회 중...")
     print("   📅 주봉 데이터는 거래일 기준으로 제공되며, 주말/공휴일은 포함되지 않습니다.")
     
-    # 네이버 금융 데이터 조회 (우선)
-    print("   🔄 네이버 금융에서 실시간 데이터 확인 중...")
-    from naver_data_module import get_naver_stock_data, get_naver_historical_data
-    
-    naver_result = get_naver_stock_data(stock_code)
-    if naver_result['success']:
-        print(f"   ✅ 네이버 금융 실시간 데이터: {naver_result['stock_name']}")
-        print(f"   📈 현재가: {naver_result['current_price']:,.0f}원")
-        print(f"   📊 변동: {naver_result['change_direction']} {naver_result['change_amount']:+,}원")
-        print(f"   ⏰ 조회시간: {naver_result['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+    # 네이버 금융 실시간 시세는 처음 필요할 때 한 번만 조회하고 결과를 재사용
+    from naver_data_module import get_naver_stock_data
+    naver_result = None
+    
+    def fetch_naver():
+        nonlocal naver_result
+        if naver_result is None:
+            naver_result = get_naver_stock_data(stock_code)
+        return naver_result
+    
+    if verbose:
+        print("   🔄 네이버 금융에서 실시간 데이터 확인 중...")
+        realtime = fetch_naver()
+        if realtime['success']:
+            print(f"   ✅ 네이버 금융 실시간 데이터: {realtime['stock_name']}")
+            print(f"   📈 현재가: {realtime['current_price']:,.0f}원")
+            print(f"   📊 변동: {realtime['change_direction']} {realtime['change_amount']:+,}원")
+            print(f"   ⏰ 조회시간: {realtime['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Yahoo Finance에서 주봉 데이터 조회 (주 데이터)
     yf_weekly_data = None
     tickers_to_try = [
         f"{stock_code}.KS",   # 코스피
-        f"{stock_code}.KQ",   # 코스닥 (일부)
-        f"{stock_code}.KS",   # 다시 시도
+        f"{stock_code}.KQ",   # 코스닥
     ]
     
-    for i, ticker in enumerate(tickers_to_try):
-        try:
-            print(f"   시도 {i+1}: {ticker}")
-            stock = yf.Ticker(ticker)
-            # 5년 주봉 데이터 조회
-            hist = stock.history(period="5y", interval="1wk")
-            
-            if not hist.empty:
-                print(f"✅ Yahoo Finance 주봉: {hist.index[0].strftime('%Y-%m-%d')} ~ {hist.index[-1].strftime('%Y-%m-%d')} 기간 주봉 데이터를 조회했습니다.")
-                print(f"📅 총 {len(hist)}주간의 주봉 거래 데이터를 가져왔습니다.")
-                print(f"🏢 사용된 티커: {ticker}")
-                yf_weekly_data = hist
-                break
-                
-        except Exception as e:
-            print(f"   ❌ {ticker} 시도 실패: {str(e)[:50]}...")
-            continue
+    print(f"   시도: {', '.join(tickers_to_try)} 동시 조회")
+    # 5년 주봉 데이터 조회
+    ticker, stock, hist = _fetch_first_history(tickers_to_try, period="5y", interval="1wk")
+    if hist is not None:
+        print(f"✅ Yahoo Finance 주봉: {hist.index[0].strftime('%Y-%m-%d')} ~ {hist.index[-1].strftime('%Y-%m-%d')} 기간 주봉 데이터를 조회했습니다.")
+        print(f"📅 총 {len(hist)}주간의 주봉 거래 데이터를 가져왔습니다.")
+        print(f"🏢 사용된 티커: {ticker}")
+        yf_weekly_data = hist
     
     # Yahoo Finance 주봉 데이터가 있는 경우 최신도 확인
     if yf_weekly_data is not None:
         # 최신 데이터 확인 (현재 날짜와 비교)
-        latest_weekly_date = yf_weekly_data.index[-1]
-        # 타임존 정보 제거
-        if hasattr(latest_weekly_date, 'tz_localize'):
-            latest_weekly_date = latest_weekly_date.tz_localize(None)
-        elif hasattr(latest_weekly_date, 'replace'):
-            latest_weekly_date = latest_weekly_date.replace(tzinfo=None)
+        # (시간대 정보는 조회 시 이미 제거됨)
+        latest_weekly_date = yf_weekly_data.index[-1].to_pydatetime()
         
         current_date = datetime.now()
         days_diff = (current_date - latest_weekly_date).days
@@ -127,31 +235,23 @@ def get_weekly_stock_data(stock_code):
             # Yahoo Finance에서 일봉 데이터 조회 (최근 90일 + 오늘까지 확실히 포함)
             try:
                 # 먼저 period로 시도
-                daily_hist = stock.history(period="90d", interval="1d")
+                daily_hist = _drop_timezone(stock.history(period="90d", interval="1d"))
                 
                 # 만약 오늘 데이터가 없다면 start/end로 다시 시도
                 if not daily_hist.empty:
-                    latest_date = daily_hist.index[-1]
-                    if hasattr(latest_date, 'tz_localize'):
-                        latest_date = latest_date.tz_localize(None)
-                    elif hasattr(latest_date, 'replace'):
-                        latest_date = latest_date.replace(tzinfo=None)
+                    latest_date = daily_hist.index[-1].to_pydatetime()
                     
                     # 오늘 데이터가 없으면 start/end로 다시 시도
                     if latest_date.date() < current_date.date():
                         print(f"   🔄 오늘 데이터가 없어 start/end 파라미터로 재시도합니다...")
                         start_date = (current_date - timedelta(days=90)).strftime('%Y-%m-%d')
                         end_date = current_date.strftime('%Y-%m-%d')
-                        daily_hist = stock.history(start=start_date, end=end_date, interval="1d")
+                        daily_hist = _drop_timezone(stock.history(start=start_date, end=end_date, interval="1d"))
                 if not daily_hist.empty:
                     print(f"   ✅ Yahoo Finance 일봉: {daily_hist.index[0].strftime('%Y-%m-%d')} ~ {daily_hist.index[-1].strftime('%Y-%m-%d')}")
                     
                     # 일봉 데이터의 최신 날짜 확인
-                    latest_daily_date = daily_hist.index[-1]
-                    if hasattr(latest_daily_date, 'tz_localize'):
-                        latest_daily_date = latest_daily_date.tz_localize(None)
-                    elif hasattr(latest_daily_date, 'replace'):
-                        latest_daily_date = latest_daily_date.replace(tzinfo=None)
+                    latest_daily_date = daily_hist.index[-1].to_pydatetime()
                     
                     print(f"   📅 일봉 최신 데이터: {latest_daily_date.strftime('%Y-%m-%d')}")
                     print(f"   📅 현재 날짜: {current_date.strftime('%Y-%m-%d')}")
@@ -168,7 +268,7 @@ def get_weekly_stock_data(stock_code):
                         print(f"      {date.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f}")
                     
                     # 일봉을 주봉으로 변환
-                    enhanced_weekly_data = convert_daily_to_weekly(daily_hist, yf_weekly_data, stock_code)
+                    enhanced_weekly_data = convert_daily_to_weekly(daily_hist, yf_weekly_data, stock_code, fetch_naver=fetch_naver)
                     if enhanced_weekly_data is not None:
                         print(f"   ✅ 일봉 데이터로 주봉을 보완했습니다!")
                         print(f"   📅 최신 주봉 데이터: {enhanced_weekly_data.index[-1].strftime('%Y-%m-%d')}")
@@ -186,24 +286,19 @@ def get_weekly_stock_data(stock_code):
     print("   ⚠️ Yahoo Finance에서 주봉 데이터를 가져올 수 없습니다.")
     print("   🔄 Yahoo Finance 일봉 데이터로 주봉을 생성합니다...")
     
-    # Yahoo Finance에서 일봉 데이터로 주봉 생성 시도
-    for ticker in tickers_to_try:
+    # Yahoo Finance에서 일봉 데이터로 주봉 생성 시도 (5년 일봉, 코스피/코스닥 동시 조회)
+    ticker, stock, daily_hist = _fetch_first_history(tickers_to_try, period="5y", interval="1d")
+    if daily_hist is not None:
         try:
-            stock = yf.Ticker(ticker)
-            # 5년 일봉 데이터 조회
-            daily_hist = stock.history(period="5y", interval="1d")
-            if not daily_hist.empty:
-                print(f"   ✅ Yahoo Finance 일봉: {daily_hist.index[0].strftime('%Y-%m-%d')} ~ {daily_hist.index[-1].strftime('%Y-%m-%d')}")
-                
-                # 일봉을 주봉으로 변환
-                weekly_from_daily = convert_daily_to_weekly(daily_hist, None, stock_code)
-                if weekly_from_daily is not None:
-                    print(f"   ✅ 일봉 데이터로 주봉을 생성했습니다!")
-                    return weekly_from_daily
-                break
+            print(f"   ✅ Yahoo Finance 일봉: {daily_hist.index[0].strftime('%Y-%m-%d')} ~ {daily_hist.index[-1].strftime('%Y-%m-%d')}")
+            
+            # 일봉을 주봉으로 변환
+            weekly_from_daily = convert_daily_to_weekly(daily_hist, None, stock_code, fetch_naver=fetch_naver)
+            if weekly_from_daily is not None:
+                print(f"   ✅ 일봉 데이터로 주봉을 생성했습니다!")
+                return weekly_from_daily
         except Exception as e:
             print(f"   ❌ {ticker} 일봉 시도 실패: {str(e)[:50]}...")
-            continue
     
     # 모든 소스에서 실패
     print("❌ 주봉 데이터 조회에 실패했습니다.")
@@ -213,122 +308,76 @@ def get_weekly_stock_data(stock_code):
     print("   - Yahoo Finance에서 지원하지 않는 종목입니다")
     return None
 
-def convert_daily_to_weekly(daily_data, existing_weekly_data=None, stock_code=None):
-    """일봉 데이터를 주봉으로 변환 (미완성 주 포함) - 네이버 실시간 데이터 활용"""
+def convert_daily_to_weekly(daily_data, existing_weekly_data=None, stock_code=None, fetch_naver=None):
+    """일봉 데이터를 주봉으로 변환 (미완성 주 포함) - 네이버 실시간 데이터 활용
+    
+    fetch_naver: 네이버 실시간 시세 조회 함수 (없으면 stock_code로 조회), 현재 주가 있을 때만 호출
+    """
     try:
-        # 일봉 데이터를 주별로 그룹화
-        daily_data_copy = daily_data.copy()
-        daily_data_copy.index.name = 'Date'
-        
         # 현재 날짜 확인
         current_date = datetime.now().date()
         
-        # 네이버 금융 실시간 데이터 가져오기 (현재 주 업데이트용)
-        naver_current_price = None
-        if stock_code:
-            try:
-                from naver_data_module import get_naver_stock_data
-                naver_result = get_naver_stock_data(stock_code)
-                if naver_result['success']:
-                    naver_current_price = naver_result['current_price']
-                    print(f"   🔄 네이버 실시간 데이터로 현재 주 업데이트: {naver_current_price:,.0f}원")
-            except Exception as e:
-                print(f"   ⚠️ 네이버 실시간 데이터 조회 실패: {str(e)[:30]}...")
-        
-        # 주별로 그룹화 (월요일을 주의 시작으로 가정)
-        daily_data_copy['Week'] = daily_data_copy.index.to_period('W-MON')
-        
-        weekly_data = []
-        
-        for week, group in daily_data_copy.groupby('Week'):
-            if len(group) > 0:
-                # 주봉 데이터 계산
-                week_start = group.index[0]
-                
-                # 미완성 주인지 확인 (현재 주인 경우)
-                is_current_week = False
-                if hasattr(week_start, 'date'):
-                    week_start_date = week_start.date()
-                else:
-                    week_start_date = week_start
-                
-                # 현재 주인지 확인 (월요일부터 현재까지)
-                week_end_date = week_start_date + timedelta(days=6)
-                if week_start_date <= current_date <= week_end_date:
-                    is_current_week = True
-                    print(f"   📅 현재 주 감지: {week_start_date} ~ {week_end_date}")
-                
-                # 현재 주인 경우 실제 마지막 거래일을 날짜로 사용
-                if is_current_week:
-                    # 현재 주의 실제 마지막 거래일 찾기
-                    last_trading_day = group.index[-1]
-                    actual_close = group['Close'].iloc[-1]
-                    
-                    # 네이버 실시간 데이터가 있으면 현재 주 종가 업데이트
-                    if naver_current_price is not None:
-                        # 오늘 데이터가 있는지 확인
-                        today_data = group[group.index.date == current_date]
-                        if not today_data.empty:
-                            # 오늘 데이터가 있으면 네이버 실시간 가격으로 업데이트
-                            actual_close = naver_current_price
-                            print(f"      📅 오늘 데이터 포함, 네이버 실시간 가격으로 업데이트: {actual_close:,.0f}원")
-                        else:
-                            # 오늘 데이터가 없어도 네이버 실시간 가격이 마지막 거래일 종가와 다르면 업데이트
-                            if abs(naver_current_price - actual_close) > 0:
-                                actual_close = naver_current_price
-                                print(f"      📅 네이버 실시간 가격으로 현재 주 종가 업데이트: {actual_close:,.0f}원")
-                            else:
-                                print(f"      📅 네이버 실시간 가격과 동일, 마지막 거래일 종가 사용: {actual_close:,.0f}원")
-                    else:
-                        print(f"      📅 현재 주 마지막 거래일: {last_trading_day.strftime('%Y-%m-%d')}, 종가: {actual_close:,.0f}")
-                    
-                    # 현재 주는 실제 마지막 거래일을 날짜로 사용
-                    weekly_data.append({
-                        'Date': last_trading_day,       # 실제 마지막 거래일
-                        'Open': group['Open'].iloc[0],  # 주 첫날 시가
-                        'High': group['High'].max(),    # 주 최고가
-                        'Low': group['Low'].min(),      # 주 최저가
-                        'Close': actual_close,          # 실제 마지막 거래일 종가 (또는 네이버 실시간)
-                        'Volume': group['Volume'].sum(), # 주 총 거래량
-                        'IsCurrentWeek': is_current_week # 현재 주 여부
-                    })
-                else:
-                    # 완성된 주는 기존 방식
-                    weekly_data.append({
-                        'Date': week_start,
-                        'Open': group['Open'].iloc[0],      # 주 첫날 시가
-                        'High': group['High'].max(),        # 주 최고가
-                        'Low': group['Low'].min(),          # 주 최저가
-                        'Close': group['Close'].iloc[-1],   # 주 마지막날 종가
-                        'Volume': group['Volume'].sum(),    # 주 총 거래량
-                        'IsCurrentWeek': is_current_week    # 현재 주 여부
-                    })
-        
-        if not weekly_data:
+        # 주별로 한 번에 집계 (월요일 시작 주, 월요일 날짜를 라벨로 사용 - Yahoo Finance 주봉과 동일)
+        weekly_df = daily_data.resample('W-MON', label='left', closed='left').agg({
+            'Open': 'first',    # 주 첫날 시가
+            'High': 'max',      # 주 최고가
+            'Low': 'min',       # 주 최저가
+            'Close': 'last',    # 주 마지막날 종가
+            'Volume': 'sum',    # 주 총 거래량
+        }).dropna(subset=['Open'])  # 거래일이 없는 주(연휴 등) 제외
+        weekly_df.index.name = 'Date'
+        # 주 시작(월요일) 라벨 - 현재 주 날짜를 바꾸기 전에 보관해 기존 주봉과 병합할 때 사용
+        week_labels = weekly_df.index
+        
+        if weekly_df.empty:
             print("   ❌ 주봉 데이터 변환에 실패했습니다.")
             return None
         
-        # 주봉 DataFrame 생성
-        weekly_df = pd.DataFrame(weekly_data)
-        weekly_df.set_index('Date', inplace=True)
-        weekly_df.sort_index(inplace=True)
-        
-        # 현재 주가 있는지 확인
-        current_weeks = weekly_df[weekly_df['IsCurrentWeek'] == True]
-        if not current_weeks.empty:
-            print(f"   ✅ 현재 주 포함: {len(current_weeks)}주")
-            for idx, row in current_weeks.iterrows():
-                print(f"      📅 {idx.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f}")
-        
-        # IsCurrentWeek 컬럼 제거 (분석에 불필요)
-        weekly_df = weekly_df.drop('IsCurrentWeek', axis=1)
+        # 미완성 주인지 확인 (마지막 주가 이번 주 월요일에 시작하는 경우)
+        week_start_date = weekly_df.index[-1].date()
+        week_end_date = week_start_date + timedelta(days=6)
+        if week_start_date <= current_date <= week_end_date:
+            print(f"   📅 현재 주 감지: {week_start_date} ~ {week_end_date}")
+            
+            # 현재 주의 실제 마지막 거래일
+            last_trading_day = daily_data.index[-1]
+            
+            # 네이버 금융 실시간 데이터 가져오기 (현재 주 업데이트용)
+            naver_current_price = None
+            if fetch_naver is None and stock_code:
+                from naver_data_module import get_naver_stock_data
+                fetch_naver = lambda: get_naver_stock_data(stock_code)
+            if fetch_naver is not None:
+                try:
+                    naver_result = fetch_naver()
+                    if naver_result['success']:
+                        naver_current_price = naver_result['current_price']
+                        print(f"   🔄 네이버 실시간 데이터로 현재 주 업데이트: {naver_current_price:,.0f}원")
+                except Exception as e:
+                    print(f"   ⚠️ 네이버 실시간 데이터 조회 실패: {str(e)[:30]}...")
+            
+            # 네이버 실시간 데이터가 있으면 현재 주 종가 업데이트
+            if naver_current_price is not None:
+                weekly_df.iloc[-1, weekly_df.columns.get_loc('Close')] = naver_current_price
+                print(f"      📅 네이버 실시간 가격으로 현재 주 종가 업데이트: {naver_current_price:,.0f}원")
+            else:
+                print(f"      📅 현재 주 마지막 거래일: {last_trading_day.strftime('%Y-%m-%d')}, 종가: {weekly_df['Close'].iloc[-1]:,.0f}")
+            
+            # 현재 주는 실제 마지막 거래일을 날짜로 사용
+            weekly_df = weekly_df.rename(index={weekly_df.index[-1]: last_trading_day})
+            
+            print(f"   ✅ 현재 주 포함: 1주")
+            print(f"      📅 {last_trading_day.strftime('%Y-%m-%d')}: {weekly_df['Open'].iloc[-1]:,.0f} → {weekly_df['Close'].iloc[-1]:,.0f}")
         
         # 기존 주봉 데이터가 있는 경우 병합
         if existing_weekly_data is not None:
-            # 중복 제거하고 병합
-            combined_data = pd.concat([existing_weekly_data, weekly_df])
-            combined_data = combined_data[~combined_data.index.duplicated(keep='last')]
-            combined_data.sort_index(inplace=True)
+            # 신규 주봉과 주(월요일 라벨)가 겹치지 않는 기존 주봉만 남겨 이어 붙임 (겹치는 주는 신규 값 사용, 기존 데이터는 수정하지 않음)
+            # 현재 주는 마지막 거래일로 날짜를 바꿨으므로 월요일 라벨로 비교해야 Yahoo의 현재 주 행과 중복되지 않음
+            kept_data = existing_weekly_data.loc[~existing_weekly_data.index.isin(week_labels)]
+            combined_data = pd.concat([kept_data, weekly_df])
+            # 신규 주봉이 기존 주봉 뒤에 이어지면 이미 날짜순이므로 정렬 생략
+            if not combined_data.index.is_monotonic_increasing:
+                combined_data = combined_data.sort_index()
             
             print(f"   📅 기존 주봉: {len(existing_weekly_data)}주 + 신규 주봉: {len(weekly_df)}주 = 총 {len(combined_data)}주")
             return combined_data
@@ -342,18 +391,48 @@ def convert_daily_to_weekly(daily_data, existing_weekly_data=None, stock_code=No
 
 
 
+def _move_mean(values, window):
+    """이동평균 - bottleneck이 있으면 사용, 없으면 pandas rolling
+    
+    bottleneck은 데이터가 window보다 짧으면 오류를 내므로 그 경우는 pandas rolling으로 계산 (전부 NaN)
+    """
+    if bn is not None and window <= len(values):
+        return bn.move_mean(values, window, min_count=window)
+    return pd.Series(values).rolling(window=window).mean().to_numpy()
+
+def _move_std(values, window):
+    """이동 표준편차 (표본 표준편차, ddof=1)"""
+    if bn is not None and window <= len(values):
+        return bn.move_std(values, window, min_count=window, ddof=1)
+    return pd.Series(values).rolling(window=window).std().to_numpy()
+
+def _move_max(values, window):
+    """이동 최댓값"""
+    if bn is not None and window <= len(values):
+        return bn.move_max(values, window, min_count=window)
+    return pd.Series(values).rolling(window=window).max().to_numpy()
+
+def _move_min(values, window):
+    """이동 최솟값"""
+    if bn is not None and window <= len(values):
+        return bn.move_min(values, window, min_count=window)
+    return pd.Series(values).rolling(window=window).min().to_numpy()
+
 def calculate_technical_indicators(df):
     """기술적 지표 계산"""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    cols = {}
+    
     # 이동평균선 (주간 기준)
-    df['MA5'] = df['Close'].rolling(window=5).mean()
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    df['MA60'] = df['Close'].rolling(window=60).mean()
+    cols['MA5'] = _move_mean(close, 5)
+    cols['MA20'] = _move_mean(close, 20)
+    cols['MA60'] = _move_mean(close, 60)
     
     # 볼린저 밴드 계산 (20주 기준)
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    bb_std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (bb_std * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (bb_std * 2)
+    cols['BB_Middle'] = cols['MA20']
+    bb_std = _move_std(close, 20)
+    cols['BB_Upper'] = cols['BB_Middle'] + (bb_std * 2)
+    cols['BB_Lower'] = cols['BB_Middle'] - (bb_std * 2)
     
     # 스토캐스틱 슬로우 계산
     # %K = (현재가 - 최저가) / (최고가 - 최저가) * 100
@@ -365,22 +444,33 @@ def calculate_technical_indicators(df):
     period = 14
     
     # 최고가와 최저가 계산
-    high_14 = df['High'].rolling(window=period).max()
-    low_14 = df['Low'].rolling(window=period).min()
+    high_14 = _move_max(df['High'].to_numpy(dtype=np.float64), period)
+    low_14 = _move_min(df['Low'].to_numpy(dtype=np.float64), period)
     
     # %K 계산
-    k_fast = ((df['Close'] - low_14) / (high_14 - low_14)) * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k_fast = ((close - low_14) / (high_14 - low_14)) * 100
     
     # %D 계산 (3주 이동평균)
-    d_fast = k_fast.rolling(window=3).mean()
+    d_fast = _move_mean(k_fast, 3)
     
     # Slow %K = %D
-    df['Stoch_K'] = d_fast
+    cols['Stoch_K'] = d_fast
     
     # Slow %D = Slow %K의 3주 이동평균
-    df['Stoch_D'] = df['Stoch_K'].rolling(window=3).mean()
+    cols['Stoch_D'] = _move_mean(d_fast, 3)
     
-    return df
+    # 컬럼을 하나씩 추가하지 않고 한 번에 붙여 새 DataFrame 반환 (원본 df는 변경하지 않음)
+    return df.assign(**cols)
+
+# calculate_technical_indicators가 추가하는 컬럼
+INDICATOR_COLUMNS = frozenset(['MA5', 'MA20', 'MA60', 'BB_Middle', 'BB_Upper', 'BB_Lower', 'Stoch_K', 'Stoch_D'])
+
+def _ensure_technical_indicators(df):
+    """지표가 이미 계산된 DataFrame이면 그대로, 아니면 지표를 계산해 반환"""
+    if INDICATOR_COLUMNS.issubset(df.columns):
+        return df
+    return calculate_technical_indicators(df)
 
 def analyze_weekly_stock_data(hist, stock_code):
     """주식 주봉 데이터 분석"""
@@ -391,20 +481,26 @@ def analyze_weekly_stock_data(hist, stock_code):
     print(f"📊 {stock_code} 주식 주봉 분석 결과")
     print("="*60)
     
+    # 가격/거래량 컬럼을 한 번만 NumPy 배열로 꺼내 위치 인덱스로 사용 (Open, High, Low, Close, Volume 순)
+    ohlcv = hist[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+    first_open = ohlcv[0, 0]
+    current_price = ohlcv[-1, 3]
+    volume = ohlcv[:, 4]
+    
     # 기본 통계
     print(f"📅 조회 기간: {hist.index[0].strftime('%Y-%m-%d')} ~ {hist.index[-1].strftime('%Y-%m-%d')}")
     print(f"📈 주봉 거래주 수: {len(hist)}주")
     
     # 가격 정보
     print(f"\n💰 가격 정보:")
-    print(f"   시작가: {hist['Open'].iloc[0]:,.0f}원")
-    print(f"   종가: {hist['Close'].iloc[-1]:,.0f}원")
-    print(f"   최고가: {hist['High'].max():,.0f}원")
-    print(f"   최저가: {hist['Low'].min():,.0f}원")
+    print(f"   시작가: {first_open:,.0f}원")
+    print(f"   종가: {current_price:,.0f}원")
+    print(f"   최고가: {np.nanmax(ohlcv[:, 1]):,.0f}원")
+    print(f"   최저가: {np.nanmin(ohlcv[:, 2]):,.0f}원")
     
     # 변동 정보
-    price_change = hist['Close'].iloc[-1] - hist['Open'].iloc[0]
-    price_change_pct = (price_change / hist['Open'].iloc[0]) * 100
+    price_change = current_price - first_open
+    price_change_pct = (price_change / first_open) * 100
     
     print(f"\n📊 변동 정보:")
     print(f"   가격 변동: {price_change:+,.0f}원")
@@ -412,25 +508,25 @@ def analyze_weekly_stock_data(hist, stock_code):
     
     # 주봉 거래량 정보
     print(f"\n📈 주봉 거래량 정보:")
-    print(f"   평균 주봉 거래량: {hist['Volume'].mean():,.0f}주")
-    print(f"   최대 주봉 거래량: {hist['Volume'].max():,.0f}주")
-    print(f"   최소 주봉 거래량: {hist['Volume'].min():,.0f}주")
+    print(f"   평균 주봉 거래량: {np.nanmean(volume):,.0f}주")
+    print(f"   최대 주봉 거래량: {np.nanmax(volume):,.0f}주")
+    print(f"   최소 주봉 거래량: {np.nanmin(volume):,.0f}주")
+    
+    # 기술적 지표 계산 (이미 계산된 데이터가 전달되면 재계산 생략)
+    df_with_indicators = _ensure_technical_indicators(hist)
     
-    # 기술적 지표 계산
-    df_with_indicators = calculate_technical_indicators(hist.copy())
+    # 최근 지표 값을 한 번에 추출
+    ma5, ma20, ma60, bb_upper, bb_middle, bb_lower, stoch_k, stoch_d = df_with_indicators[
+        ['MA5', 'MA20', 'MA60', 'BB_Upper', 'BB_Middle', 'BB_Lower', 'Stoch_K', 'Stoch_D']
+    ].iloc[-1].to_numpy(dtype=np.float64)
     
     # 기술적 지표 정보
     print(f"\n📊 기술적 지표 (최근값):")
-    print(f"   5주 이동평균: {df_with_indicators['MA5'].iloc[-1]:,.0f}원")
-    print(f"   20주 이동평균: {df_with_indicators['MA20'].iloc[-1]:,.0f}원")
-    print(f"   60주 이동평균: {df_with_indicators['MA60'].iloc[-1]:,.0f}원")
+    print(f"   5주 이동평균: {ma5:,.0f}원")
+    print(f"   20주 이동평균: {ma20:,.0f}원")
+    print(f"   60주 이동평균: {ma60:,.0f}원")
     
     # 볼린저 밴드 정보
-    current_price = hist['Close'].iloc[-1]
-    bb_upper = df_with_indicators['BB_Upper'].iloc[-1]
-    bb_lower = df_with_indicators['BB_Lower'].iloc[-1]
-    bb_middle = df_with_indicators['BB_Middle'].iloc[-1]
-    
     print(f"   볼린저 밴드 상단: {bb_upper:,.0f}원")
     print(f"   볼린저 밴드 중간: {bb_middle:,.0f}원")
     print(f"   볼린저 밴드 하단: {bb_lower:,.0f}원")
@@ -444,8 +540,6 @@ def analyze_weekly_stock_data(hist, stock_code):
         print("   볼린저 밴드 신호: 중립 구간")
     
     # 스토캐스틱 정보
-    stoch_k = df_with_indicators['Stoch_K'].iloc[-1]
-    stoch_d = df_with_indicators['Stoch_D'].iloc[-1]
     print(f"   스토캐스틱 %K: {stoch_k:.1f}")
     print(f"   스토캐스틱 %D: {stoch_d:.1f}")
     
@@ -457,195 +551,263 @@ def analyze_weekly_stock_data(hist, stock_code):
     else:
         print("   스토캐스틱 신호: 중립 구간")
 
-def create_weekly_stock_chart(hist, stock_code):
-    """주식 주봉 차트 생성 (캔들차트 + 보조지표) - test_overlay_chart.py 스타일 적용"""
+# 보조지표 선(MA/BB)을 그릴 최대 점 개수 - 이보다 길면 LTTB로 줄여서 그림 (캔들은 원본 유지)
+MAX_OVERLAY_POINTS = 500
+
+def _overlay_indices(x, close, n_out=MAX_OVERLAY_POINTS):
+    """보조지표 선을 그릴 행 위치 반환 (점이 많고 tsdownsample이 있으면 LTTB, 아니면 전체)"""
+    if LTTBDownsampler is None or len(x) <= n_out:
+        return slice(None)
+    return LTTBDownsampler().downsample(x, close, n_out=n_out)
+
+def create_weekly_stock_chart(hist, stock_code, dpi=150, date_tag=None):
+    """주식 주봉 차트 생성 (캔들차트 + 보조지표) - test_overlay_chart.py 스타일 적용 (date_tag: 파일명 날짜, 없으면 오늘)"""
     if hist is None or hist.empty:
         return None, None
     
     print(f"\n📈 주봉 캔들차트를 생성합니다...")
     
-    # 기술적 지표 계산
-    df = calculate_technical_indicators(hist.copy())
-    df.index.name = 'Date'
-    
-    # 차트 생성 (3개 패널: 메인차트, 거래량, 스토캐스틱)
-    fig, axes = plt.subplots(3, 1, figsize=(15, 12), height_ratios=[8, 2, 2])
-    fig.suptitle(f'{stock_code} Weekly Stock Chart (5 Years) - Image Reference Style', fontsize=16, fontweight='bold')
-    
-    # 1. 메인 차트 (캔들차트 + 보조지표 오버레이)
-    ax1 = axes[0]
-    
-    # 볼린저 밴드 영역 채우기 (이미지 참고 - 오렌지/베이지 스타일)
-    ax1.fill_between(df.index, df['BB_Upper'], df['BB_Lower'], 
-                     alpha=0.15, color='#FFE4B5', label='Bollinger Bands')
-    
-    # 볼린저 밴드 상단과 하단을 오렌지/베이지 색으로 표시 (범례에 표시하지 않음)
-    ax1.plot(df.index, df['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
-    ax1.plot(df.index, df['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
-    
-    # 캔들차트 그리기 (이미지 참고 - 빨간색/파란색)
-    for i, (date, row) in enumerate(df.iterrows()):
-        if row['Close'] >= row['Open']:  # 상승
-            color = '#FF4444'  # 빨간색
-        else:  # 하락
-            color = '#4444FF'  # 파란색
-        
-        ax1.plot([date, date], [row['Low'], row['High']], color=color, linewidth=1.0)
-        ax1.plot([date, date], [row['Open'], row['Close']], color=color, linewidth=3.0)
-    
-    # 이동평균선 추가 (웹 트레이딩 스타일 유지)
-    ax1.plot(df.index, df['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')
-    ax1.plot(df.index, df['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')
-    ax1.plot(df.index, df['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')
-    
-    # 메인 차트 설정
-    ax1.set_title('Price Chart with Bollinger Bands and Moving Averages', fontsize=14, fontweight='bold')
-    ax1.set_ylabel('Price (KRW)', fontsize=12, fontweight='bold')
-    ax1.legend(loc='upper left', fontsize=10, framealpha=0.9)
-    ax1.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
-    
-    # Y축을 오른쪽으로 이동
-    ax1.yaxis.set_label_position('right')
-    ax1.yaxis.tick_right()
-    
-    # 2. 거래량 차트 (두 번째 패널) - 웹 트레이딩 스타일 유지
-    ax2 = axes[1]
-    
-    # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색)
-    colors = ['#FF4444' if close >= open else '#4444FF' 
-              for close, open in zip(df['Close'], df['Open'])]
-    
-    ax2.bar(df.index, df['Volume'], color=colors, alpha=0.7, width=0.8)
-    ax2.set_title('Volume', fontsize=12, fontweight='bold')
-    ax2.set_ylabel('Volume', fontsize=10, fontweight='bold')
-    ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
-    
-    # Y축을 오른쪽으로 이동
-    ax2.yaxis.set_label_position('right')
-    ax2.yaxis.tick_right()
-    
-    # 3. 스토캐스틱 차트 (세 번째 패널) - 웹 트레이딩 스타일 유지
-    ax3 = axes[2]
-    ax3.plot(df.index, df['Stoch_K'], color='#3B82F6', linewidth=2.0, label='%K')
-    ax3.plot(df.index, df['Stoch_D'], color='#F59E0B', linewidth=2.0, label='%D')
-    ax3.axhline(y=80, color='#EF4444', linestyle='--', alpha=0.8, linewidth=1.5, label='Overbought')
-    ax3.axhline(y=20, color='#10B981', linestyle='--', alpha=0.8, linewidth=1.5, label='Oversold')
-    ax3.set_ylim(0, 100)
-    ax3.set_title('Stochastic Slow', fontsize=12, fontweight='bold')
-    ax3.set_ylabel('%K/%D', fontsize=10, fontweight='bold')
-    ax3.legend(fontsize=10, framealpha=0.9)
-    ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+    # 기술적 지표 계산 (이미 계산된 데이터가 전달되면 재계산 생략)
+    df = _ensure_technical_indicators(hist).rename_axis('Date')
     
-    # Y축을 오른쪽으로 이동
-    ax3.yaxis.set_label_position('right')
-    ax3.yaxis.tick_right()
+    # 날짜 → matplotlib 수치 좌표 변환을 한 번만 수행하고 모든 패널에서 재사용
+    x = mdates.date2num(df.index.to_pydatetime())
     
-    # X축 날짜 설정 - 하단에만 표시
-    for i, ax in enumerate(axes):
-        if i == len(axes) - 1:  # 마지막 패널에만 날짜 표시
-            # 주간 차트이므로 적절한 간격으로 날짜 선택
-            date_indices = [df.index[0], df.index[len(df)//4], df.index[len(df)//2], 
-                           df.index[3*len(df)//4], df.index[-1]]
-            ax.set_xticks(date_indices)
-            ax.set_xticklabels([date.strftime('%Y-%m-%d') for date in date_indices], 
-                              rotation=45, ha='right', fontweight='bold')
-        else:
-            ax.set_xticks([])  # 다른 패널은 X축 눈금 숨김
-    
-    plt.tight_layout()
-    
-    # 차트를 이미지로 저장
-    
-    # weekly_charts 폴더 생성
-    charts_dir = "weekly_charts"
-    if not os.path.exists(charts_dir):
-        os.makedirs(charts_dir)
-        print(f"📁 {charts_dir} 폴더를 생성했습니다.")
-    
-    # 종목명 가져오기 (yfinance에서) - 코스피/코스닥 자동 구분
-    stock_name = stock_code  # 기본값
-    tickers_to_try = [
-        f"{stock_code}.KS",   # 코스피
-        f"{stock_code}.KQ",   # 코스닥
-    ]
-    
-    for ticker in tickers_to_try:
+    # 차트 생성 (3개 패널: 메인차트, 거래량, 스토캐스틱)
+    # sharex=True: 세 패널이 같은 X축(눈금/범위)을 공유
+    fig, axes = plt.subplots(3, 1, figsize=(15, 12), height_ratios=[8, 2, 2], sharex=True)
+    try:
+        fig.suptitle(f'{stock_code} Weekly Stock Chart (5 Years) - Image Reference Style', fontsize=16, fontweight='bold')
+        
+        # 1. 메인 차트 (캔들차트 + 보조지표 오버레이)
+        ax1 = axes[0]
+        
+        # 보조지표 선(MA/BB)은 매끄러우므로 점이 많으면 다운샘플링한 위치만 사용 (5년 주봉 ≈260개는 그대로)
+        overlay_idx = _overlay_indices(x, df['Close'].to_numpy(dtype=float))
+        x_overlay = x[overlay_idx]
+        df_overlay = df.iloc[overlay_idx]
+        
+        # 볼린저 밴드 영역 채우기 (이미지 참고 - 오렌지/베이지 스타일)
+        ax1.fill_between(x_overlay, df_overlay['BB_Upper'], df_overlay['BB_Lower'], 
+                         alpha=0.15, color='#FFE4B5', label='Bollinger Bands')
+        
+        # 볼린저 밴드 상단과 하단을 오렌지/베이지 색으로 표시 (범례에 표시하지 않음)
+        ax1.plot(x_overlay, df_overlay['BB_Upper'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+        ax1.plot(x_overlay, df_overlay['BB_Lower'], color='#FFCE89', alpha=0.8, linewidth=1.5, label='_nolegend_')
+        
+        # 캔들차트 그리기 (이미지 참고 - 빨간색/파란색)
+        # 봉마다 plot()을 호출하지 않고 꼬리/몸통을 각각 하나의 LineCollection으로 추가
+        opens, highs, lows, closes = df[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=float).T
+        candle_colors = np.where(closes >= opens, '#FF4444', '#4444FF')  # 상승: 빨간색, 하락: 파란색
+        wick_segs = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+        body_segs = np.stack([np.column_stack([x, opens]), np.column_stack([x, closes])], axis=1)
+        ax1.add_collection(LineCollection(wick_segs, colors=candle_colors, linewidths=1.0, zorder=2))
+        ax1.add_collection(LineCollection(body_segs, colors=candle_colors, linewidths=3.0, zorder=2))
+        ax1.autoscale_view()
+        
+        # 이동평균선 추가 (웹 트레이딩 스타일 유지)
+        ax1.plot(x_overlay, df_overlay['MA5'], color='#F59E0B', linewidth=2.0, alpha=0.9, label='MA5')
+        ax1.plot(x_overlay, df_overlay['MA20'], color='#8B5CF6', linewidth=2.0, alpha=0.9, label='MA20')
+        ax1.plot(x_overlay, df_overlay['MA60'], color='#06B6D4', linewidth=2.0, alpha=0.9, label='MA60')
+        
+        # 메인 차트 설정
+        ax1.set_title('Price Chart with Bollinger Bands and Moving Averages', fontsize=14, fontweight='bold')
+        ax1.set_ylabel('Price (KRW)', fontsize=12, fontweight='bold')
+        ax1.legend(loc='upper left', fontsize=10, framealpha=0.9)
+        ax1.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+        
+        # Y축을 오른쪽으로 이동
+        ax1.yaxis.set_label_position('right')
+        ax1.yaxis.tick_right()
+        
+        # 2. 거래량 차트 (두 번째 패널) - 웹 트레이딩 스타일 유지
+        ax2 = axes[1]
+        
+        # 상승/하락에 따른 거래량 색상 (이미지 참고 - 빨간색/파란색) - 캔들 색상 배열 재사용
+        ax2.bar(x, df['Volume'], color=candle_colors, alpha=0.7, width=0.8)
+        ax2.set_title('Volume', fontsize=12, fontweight='bold')
+        ax2.set_ylabel('Volume', fontsize=10, fontweight='bold')
+        ax2.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+        
+        # Y축을 오른쪽으로 이동
+        ax2.yaxis.set_label_position('right')
+        ax2.yaxis.tick_right()
+        
+        # 3. 스토캐스틱 차트 (세 번째 패널) - 웹 트레이딩 스타일 유지
+        ax3 = axes[2]
+        ax3.plot(x, df['Stoch_K'], color='#3B82F6', linewidth=2.0, label='%K')
+        ax3.plot(x, df['Stoch_D'], color='#F59E0B', linewidth=2.0, label='%D')
+        stoch_handles = add_threshold_lines(ax3, [
+            (80, '#EF4444', '--', 0.8, 1.5, 'Overbought'),
+            (20, '#10B981', '--', 0.8, 1.5, 'Oversold'),
+        ])
+        ax3.set_ylim(0, 100)
+        ax3.set_title('Stochastic Slow', fontsize=12, fontweight='bold')
+        ax3.set_ylabel('%K/%D', fontsize=10, fontweight='bold')
+        ax3.legend(handles=ax3.get_legend_handles_labels()[0] + stoch_handles, fontsize=10, framealpha=0.9)
+        ax3.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+        
+        # Y축을 오른쪽으로 이동
+        ax3.yaxis.set_label_position('right')
+        ax3.yaxis.tick_right()
+        
+        # X축 날짜 설정 - 하단에만 표시 (X축을 공유하므로 마지막 패널에 한 번만 설정)
+        # 주간 차트이므로 적절한 간격으로 날짜 선택
+        n = len(df)
+        tick_idx = [0, n//4, n//2, 3*n//4, n-1]
+        ax3.set_xticks(x[tick_idx])
+        ax3.set_xticklabels([df.index[j].strftime('%Y-%m-%d') for j in tick_idx], 
+                            rotation=45, ha='right', fontweight='bold')
+        for ax in axes[:-1]:
+            ax.tick_params(axis='x', bottom=False, labelbottom=False)  # 다른 패널은 X축 눈금 숨김
+        
+        plt.tight_layout()
+        
+        # 차트를 이미지로 저장
+        
+        # 종목명 가져오기 (get_stock_name은 종목코드별로 캐시되어 추가 네트워크 요청 없음)
+        stock_name = get_stock_name(stock_code)
+        
+        # 파일명 생성: weekly_종목명_종목번호_생성일.png
+        current_date = date_tag or datetime.now().strftime("%Y%m%d")
+        base_filename = f"weekly_{stock_name}_{stock_code}_{current_date}.png"
+        
+        # 파일명에서 특수문자 제거 및 공백을 언더스코어로 변경
+        base_filename = base_filename.translate(FILENAME_TRANSLATION)
+        
+        # 파일 중복 시 버전 추가
+        filepath = _unique_path(OUTPUT_DIRS['chart'], base_filename)
+        
+        # 차트 저장
+        # tight bbox를 한 번만 계산해 전달 (savefig의 bbox 측정용 렌더링 생략)
+        renderer = fig.canvas.get_renderer()
+        bbox = fig.get_tightbbox(renderer).padded(plt.rcParams['savefig.pad_inches'])
+        # PNG는 zlib 압축 레벨 1로 저장 (파일이 약간 커지는 대신 인코딩 시간 단축, Agg 백엔드에서만 지원)
+        save_kwargs = {'pil_kwargs': {'compress_level': 1}} if matplotlib.get_backend().lower() == 'agg' else {}
+        plt.savefig(filepath, dpi=dpi, bbox_inches=bbox, **save_kwargs)
+        print(f"💾 차트가 저장되었습니다: {filepath}")
+        
+        # 차트 데이터 반환 (보조지표 포함)
+        return filepath, df
+    finally:
+        # 저장 중 예외가 나도 이 figure는 반드시 닫아 메모리 누수 방지 (차트 뷰어는 띄우지 않음)
+        plt.close(fig)
+
+@lru_cache(maxsize=1024)
+def _resolve_ticker_and_name(stock_code):
+    """종목코드로 (Yahoo 티커, 종목명) 조회 - 코스피/코스닥 자동 구분, 종목코드별로 한 번만 조회"""
+    for ticker in (f"{stock_code}.KS", f"{stock_code}.KQ"):  # 코스피 → 코스닥 순
         try:
-            stock = yf.Ticker(ticker)
-            stock_info = stock.info
+            stock_info = yf.Ticker(ticker).info
             
             # 종목명 우선순위: longName > shortName > 종목코드
-            if 'longName' in stock_info and stock_info['longName'] and stock_info['longName'] != 'N/A':
-                stock_name = stock_info['longName']
-                break
-            elif 'shortName' in stock_info and stock_info['shortName'] and stock_info['shortName'] != 'N/A':
+            long_name = stock_info.get('longName')
+            short_name = stock_info.get('shortName')
+            if long_name and long_name != 'N/A':
+                return ticker, long_name
+            elif short_name and short_name != 'N/A':
                 # shortName이 종목코드와 같은 경우는 제외
-                if stock_info['shortName'] != stock_code and not stock_info['shortName'].startswith(stock_code):
-                    stock_name = stock_info['shortName']
-                    break
-        except:
+                if short_name != stock_code and not short_name.startswith(stock_code):
+                    return ticker, short_name
+        except Exception:
             continue
     
-    # 파일명 생성: weekly_종목명_종목번호_생성일.png
-    current_date = datetime.now().strftime("%Y%m%d")
-    base_filename = f"weekly_{stock_name}_{stock_code}_{current_date}.png"
-    
-    # 파일명에서 특수문자 제거 및 공백을 언더스코어로 변경
-    base_filename = base_filename.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_")
-    
-    # 파일 중복 확인 및 버전 추가
-    version = 1
-    filename = base_filename
-    filepath = os.path.join(charts_dir, filename)
-    
-    while os.path.exists(filepath):
-        # 파일명에서 확장자 분리
-        name_without_ext = base_filename.rsplit('.', 1)[0]
-        ext = base_filename.rsplit('.', 1)[1]
-        filename = f"{name_without_ext}_v{version}.{ext}"
-        filepath = os.path.join(charts_dir, filename)
-        version += 1
-    
-    # 차트 저장
-    plt.savefig(filepath, dpi=150, bbox_inches='tight')
-    print(f"💾 차트가 저장되었습니다: {filepath}")
-    
-    # 차트 뷰어를 띄우지 않고 차트 닫기
-    plt.close()
-    
-    # 차트 데이터 반환 (보조지표 포함)
-    return filepath, df
+    return f"{stock_code}.KS", stock_code  # 기본값
 
 def get_stock_name(stock_code):
     """종목코드로 종목명을 가져오는 함수"""
     try:
-        # 코스피/코스닥 자동 구분
-        tickers_to_try = [
-            f"{stock_code}.KS",   # 코스피
-            f"{stock_code}.KQ",   # 코스닥
-        ]
-        
-        for ticker in tickers_to_try:
-            try:
-                stock = yf.Ticker(ticker)
-                stock_info = stock.info
-                
-                # 종목명 우선순위: longName > shortName > 종목코드
-                if 'longName' in stock_info and stock_info['longName'] and stock_info['longName'] != 'N/A':
-                    return stock_info['longName']
-                elif 'shortName' in stock_info and stock_info['shortName'] and stock_info['shortName'] != 'N/A':
-                    # shortName이 종목코드와 같은 경우는 제외
-                    if stock_info['shortName'] != stock_code and not stock_info['shortName'].startswith(stock_code):
-                        return stock_info['shortName']
-            except:
-                continue
-        
-        return stock_code  # 기본값
+        return _resolve_ticker_and_name(stock_code)[1]
     except:
         return stock_code
 
-def save_chart_data_to_json(chart_data, stock_code, stock_name):
-    """차트 데이터를 JSON으로 저장 - Gemini AI 최적화"""
+# 파일명에 쓸 수 없는 문자(공백, 경로 구분자, 콜론)를 언더스코어로 바꾸는 변환표
+FILENAME_TRANSLATION = str.maketrans({' ': '_', '/': '_', '\\': '_', ':': '_'})
+
+def _unique_path(directory, filename):
+    """저장 폴더를 (없으면) 만들고, 같은 이름의 파일이 있으면 _v1, _v2 ...(기존 최대 버전 + 1)를 붙인 저장 경로 반환"""
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+        print(f"📁 {directory} 폴더를 생성했습니다.")
+    
+    filepath = os.path.join(directory, filename)
+    if not os.path.exists(filepath):
+        return filepath
+    
+    # 이미 있으면 기존 버전 파일들을 한 번의 glob으로 찾아 가장 큰 버전 + 1 사용 (버전마다 존재 확인하지 않음)
+    name_without_ext, ext = os.path.splitext(filename)
+    pattern = os.path.join(glob.escape(directory), f"{glob.escape(name_without_ext)}_v*{glob.escape(ext)}")
+    version_re = re.compile(re.escape(name_without_ext) + r'_v(\d+)' + re.escape(ext))
+    versions = (version_re.fullmatch(os.path.basename(path)) for path in glob.glob(pattern))
+    next_version = 1 + max((int(match.group(1)) for match in versions if match), default=0)
+    return os.path.join(directory, f"{name_without_ext}_v{next_version}{ext}")
+
+def _compute_summary_stats(chart_data):
+    """저장 함수들이 공통으로 쓰는 가격/거래량 요약값과 최신 지표 값을 한 번에 계산"""
+    # 최고/최저/평균 등 집계는 agg 한 번으로, 첫/마지막 값은 행 단위로 한 번씩만 조회
+    reduced = chart_data.agg({'High': 'max', 'Low': 'min', 'Volume': ['mean', 'max']})
+    first_row = chart_data.iloc[0]
+    last_row = chart_data.iloc[-1]
+    return {
+        'first_open': float(first_row['Open']),
+        'last_close': float(last_row['Close']),
+        'high': float(reduced.at['max', 'High']),
+        'low': float(reduced.at['min', 'Low']),
+        'volume_mean': float(reduced.at['mean', 'Volume']),
+        'volume_max': float(reduced.at['max', 'Volume']),
+        'volume_last': float(last_row['Volume']),
+        # 최신 보조지표 값 (없는 지표는 키 자체가 없음)
+        'latest': {col: float(last_row[col]) for col in INDICATOR_COLUMNS if col in last_row},
+    }
+
+# JSON chart_data 항목에 담을 컬럼 (DataFrame 컬럼명 → JSON 키, 순서 유지)
+JSON_CHART_POINT_COLUMNS = {
+    'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume',
+    'MA5': 'ma5', 'MA20': 'ma20', 'MA60': 'ma60',
+    'Stoch_K': 'stoch_k', 'Stoch_D': 'stoch_d',
+    'BB_Upper': 'bb_upper', 'BB_Lower': 'bb_lower', 'BB_Middle': 'bb_middle',
+}
+
+@dataclass
+class ChartEnvelope:
+    """JSON 파일에서 chart_data 배열을 제외한 나머지 구조 (필드 순서 = JSON 키 순서)"""
+    metadata: dict
+    summary: dict
+    technical_indicators: dict
+    
+    @classmethod
+    def from_stats(cls, chart_data, stock_code, stock_name, stats):
+        """_compute_summary_stats 결과로 JSON 구조를 채움"""
+        return cls(
+            metadata={
+                "stock_name": stock_name,
+                "stock_code": stock_code,
+                "created_at": datetime.now().isoformat(),
+                "data_period": {
+                    "start": chart_data.index[0].strftime('%Y-%m-%d'),
+                    "end": chart_data.index[-1].strftime('%Y-%m-%d')
+                },
+                "total_records": len(chart_data),
+                "chart_type": "weekly"
+            },
+            summary={
+                "latest_close": stats['last_close'],
+                "latest_volume": int(stats['volume_last']),
+                "price_change": stats['last_close'] - stats['first_open'],
+                "price_change_pct": ((stats['last_close'] / stats['first_open']) - 1) * 100,
+                "highest_price": stats['high'],
+                "lowest_price": stats['low'],
+                "avg_volume": stats['volume_mean']
+            },
+            technical_indicators={
+                # 보조지표 최신값 (JSON_CHART_POINT_COLUMNS의 지표 순서, 없는 지표는 null)
+                "latest_values": {key: stats['latest'].get(col) for col, key in JSON_CHART_POINT_COLUMNS.items()
+                                  if col in INDICATOR_COLUMNS}
+            },
+        )
+
+def save_chart_data_to_json(chart_data, stock_code, stock_name, stats=None, date_tag=None):
+    """차트 데이터를 JSON으로 저장 - Gemini AI 최적화 (stats: _compute_summary_stats 결과, 없으면 계산)"""
     if chart_data is None or chart_data.empty:
         print("❌ 저장할 차트 데이터가 없습니다.")
         return None
@@ -653,105 +815,46 @@ def save_chart_data_to_json(chart_data, stock_code, stock_name):
     try:
         print(f"\n📊 차트 데이터를 JSON으로 저장합니다...")
         
-        # 시간대 정보 제거
-        chart_data_clean = chart_data.copy()
+        # 시간대 정보 제거 (데이터는 복사하지 않고 인덱스만 교체)
+        chart_data_clean = chart_data
         if chart_data_clean.index.tz is not None:
-            chart_data_clean.index = chart_data_clean.index.tz_localize(None)
+            chart_data_clean = chart_data_clean.set_axis(chart_data_clean.index.tz_localize(None))
             print("   🔧 시간대 정보를 제거했습니다.")
         
-        # JSON 저장 디렉토리 생성
-        json_dir = "chart_data_json"
-        if not os.path.exists(json_dir):
-            os.makedirs(json_dir)
-            print(f"📁 {json_dir} 폴더를 생성했습니다.")
-        
         # 파일명 생성
-        current_date = datetime.now().strftime("%Y%m%d")
+        current_date = date_tag or datetime.now().strftime("%Y%m%d")
         filename = f"weekly_{stock_name}_{stock_code}_{current_date}.json"
-        filename = filename.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_")
-        filepath = os.path.join(json_dir, filename)
+        filename = filename.translate(FILENAME_TRANSLATION)
         
-        # 중복 확인
-        version = 1
-        while os.path.exists(filepath):
-            name_without_ext = filename.rsplit('.', 1)[0]
-            ext = filename.rsplit('.', 1)[1]
-            filename = f"{name_without_ext}_v{version}.{ext}"
-            filepath = os.path.join(json_dir, filename)
-            version += 1
+        # JSON 저장 디렉토리 생성 및 파일 중복 시 버전 추가
+        filepath = _unique_path(OUTPUT_DIRS['json'], filename)
+        
+        # 요약값/최신 지표 값 (main에서 미리 계산해 넘겨주면 재사용)
+        if stats is None:
+            stats = _compute_summary_stats(chart_data_clean)
         
         # JSON 데이터 구조화
-        json_data = {
-            "metadata": {
-                "stock_name": stock_name,
-                "stock_code": stock_code,
-                "created_at": datetime.now().isoformat(),
-                "data_period": {
-                    "start": chart_data_clean.index[0].strftime('%Y-%m-%d'),
-                    "end": chart_data_clean.index[-1].strftime('%Y-%m-%d')
-                },
-                "total_records": len(chart_data_clean),
-                "chart_type": "weekly"
-            },
-            "summary": {
-                "latest_close": float(chart_data_clean['Close'].iloc[-1]),
-                "latest_volume": int(chart_data_clean['Volume'].iloc[-1]),
-                "price_change": float(chart_data_clean['Close'].iloc[-1] - chart_data_clean['Open'].iloc[0]),
-                "price_change_pct": float(((chart_data_clean['Close'].iloc[-1] / chart_data_clean['Open'].iloc[0]) - 1) * 100),
-                "highest_price": float(chart_data_clean['High'].max()),
-                "lowest_price": float(chart_data_clean['Low'].min()),
-                "avg_volume": float(chart_data_clean['Volume'].mean())
-            },
-            "technical_indicators": {
-                "latest_values": {
-                    "ma5": float(chart_data_clean['MA5'].iloc[-1]) if 'MA5' in chart_data_clean else None,
-                    "ma20": float(chart_data_clean['MA20'].iloc[-1]) if 'MA20' in chart_data_clean else None,
-                    "ma60": float(chart_data_clean['MA60'].iloc[-1]) if 'MA60' in chart_data_clean else None,
-                    "stoch_k": float(chart_data_clean['Stoch_K'].iloc[-1]) if 'Stoch_K' in chart_data_clean else None,
-                    "stoch_d": float(chart_data_clean['Stoch_D'].iloc[-1]) if 'Stoch_D' in chart_data_clean else None,
-                    "bb_upper": float(chart_data_clean['BB_Upper'].iloc[-1]) if 'BB_Upper' in chart_data_clean else None,
-                    "bb_lower": float(chart_data_clean['BB_Lower'].iloc[-1]) if 'BB_Lower' in chart_data_clean else None,
-                    "bb_middle": float(chart_data_clean['BB_Middle'].iloc[-1]) if 'BB_Middle' in chart_data_clean else None
-                }
-            },
-            "chart_data": []
-        }
+        envelope_data = ChartEnvelope.from_stats(chart_data_clean, stock_code, stock_name, stats)
         
-        # 차트 데이터 추가 (최근 30개 데이터만 - AI 분석에 충분)
+        # 차트 데이터 (최근 30개 데이터만 - AI 분석에 충분) - 필요한 컬럼만 골라 이름 변경
         recent_data = chart_data_clean.tail(30)
-        for date, row in recent_data.iterrows():
-            data_point = {
-                "date": date.strftime('%Y-%m-%d'),
-                "open": float(row['Open']),
-                "high": float(row['High']),
-                "low": float(row['Low']),
-                "close": float(row['Close']),
-                "volume": int(row['Volume'])
-            }
-            
-            # 기술적 지표 추가
-            if 'MA5' in row:
-                data_point["ma5"] = float(row['MA5'])
-            if 'MA20' in row:
-                data_point["ma20"] = float(row['MA20'])
-            if 'MA60' in row:
-                data_point["ma60"] = float(row['MA60'])
-            if 'Stoch_K' in row:
-                data_point["stoch_k"] = float(row['Stoch_K'])
-            if 'Stoch_D' in row:
-                data_point["stoch_d"] = float(row['Stoch_D'])
-            if 'BB_Upper' in row:
-                data_point["bb_upper"] = float(row['BB_Upper'])
-            if 'BB_Lower' in row:
-                data_point["bb_lower"] = float(row['BB_Lower'])
-            if 'BB_Middle' in row:
-                data_point["bb_middle"] = float(row['BB_Middle'])
-            
-            json_data["chart_data"].append(data_point)
+        point_columns = {col: key for col, key in JSON_CHART_POINT_COLUMNS.items() if col in recent_data.columns}
+        points = recent_data[list(point_columns)].rename(columns=point_columns).astype({'volume': 'int64'})
+        points.insert(0, 'date', recent_data.index.strftime('%Y-%m-%d'))
         
-        # JSON 파일 저장
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        # 나머지 구조 직렬화 (orjson이 있으면 데이터클래스를 바로 직렬화 - NaN은 null로 저장됨)
+        if orjson is not None:
+            envelope = orjson.dumps(envelope_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            envelope = json.dumps(asdict(envelope_data), ensure_ascii=False, indent=2).encode('utf-8')
+        
+        # JSON 파일 저장 - 구조의 마지막 "\n}"를 떼고 쓴 뒤, "chart_data" 배열은
+        # pandas to_json(C 구현)이 파일에 직접 기록 (전체 JSON 문자열을 메모리에 합치지 않음)
+        with open(filepath, 'wb') as f:
+            f.write(memoryview(envelope)[:-2])
+            f.write(b',\n  "chart_data": ')
+            points.to_json(f, orient='records')
+            f.write(b'\n}')
         
         print(f"💾 JSON 파일이 저장되었습니다: {filepath}")
         print(f"📊 데이터 구조:")
@@ -766,7 +869,7 @@ def save_chart_data_to_json(chart_data, stock_code, stock_name):
         print(f"❌ JSON 파일 저장 중 오류: {e}")
         return None
 
-def save_chart_data_to_csv(chart_data, stock_code, stock_name):
+def save_chart_data_to_csv(chart_data, stock_code, stock_name, date_tag=None):
     """차트 데이터를 CSV로 저장 - 간단하고 읽기 쉬움"""
     if chart_data is None or chart_data.empty:
         print("❌ 저장할 차트 데이터가 없습니다.")
@@ -775,36 +878,37 @@ def save_chart_data_to_csv(chart_data, stock_code, stock_name):
     try:
         print(f"\n📊 차트 데이터를 CSV로 저장합니다...")
         
-        # 시간대 정보 제거
-        chart_data_clean = chart_data.copy()
-        if chart_data_clean.index.tz is not None:
-            chart_data_clean.index = chart_data_clean.index.tz_localize(None)
-            print("   🔧 시간대 정보를 제거했습니다.")
-        
-        # CSV 저장 디렉토리 생성
-        csv_dir = "chart_data_csv"
-        if not os.path.exists(csv_dir):
-            os.makedirs(csv_dir)
-            print(f"📁 {csv_dir} 폴더를 생성했습니다.")
-        
         # 파일명 생성
-        current_date = datetime.now().strftime("%Y%m%d")
+        current_date = date_tag or datetime.now().strftime("%Y%m%d")
         filename = f"weekly_{stock_name}_{stock_code}_{current_date}.csv"
-        filename = filename.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_")
-        filepath = os.path.join(csv_dir, filename)
+        filename = filename.translate(FILENAME_TRANSLATION)
         
-        # 중복 확인
-        version = 1
-        while os.path.exists(filepath):
-            name_without_ext = filename.rsplit('.', 1)[0]
-            ext = filename.rsplit('.', 1)[1]
-            filename = f"{name_without_ext}_v{version}.{ext}"
-            filepath = os.path.join(csv_dir, filename)
-            version += 1
+        # CSV 저장 디렉토리 생성 및 파일 중복 시 버전 추가
+        filepath = _unique_path(OUTPUT_DIRS['csv'], filename)
         
         # CSV 저장 (최근 50개 데이터만)
-        recent_data = chart_data_clean.tail(50)
-        recent_data.to_csv(filepath, encoding='utf-8-sig')
+        # 전체 프레임을 복사하지 않고 최근 50개 행에 시간대 없는 인덱스만 새로 붙임
+        recent_data = chart_data.tail(50)
+        if recent_data.index.tz is not None:
+            recent_data = recent_data.set_axis(recent_data.index.tz_localize(None))
+            print("   🔧 시간대 정보를 제거했습니다.")
+        if pa is not None:
+            # PyArrow CSV writer (C++) 사용 - 날짜는 pandas to_csv와 같은 형식의 문자열로 변환
+            columns = {recent_data.index.name or '': recent_data.index.astype(str)}
+            columns.update(recent_data.items())
+            table = pa.table(columns)
+            with open(filepath, 'wb') as f:
+                # 엑셀 한글 호환용 BOM(utf-8-sig와 동일) + 헤더는 직접 기록 (PyArrow는 헤더를 항상 따옴표로 감쌈)
+                f.write(('\ufeff' + ','.join(table.column_names) + '\n').encode('utf-8'))
+                pa_csv.write_csv(table, f, write_options=pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+        else:
+            # 표준 csv.writer 사용 (pandas to_csv의 포맷터 생략) - 결측값은 to_csv처럼 빈 칸으로 기록
+            values = recent_data.astype(object).where(recent_data.notna(), '')
+            rows = zip(recent_data.index.astype(str), *(values[col].tolist() for col in values.columns))
+            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f, lineterminator=os.linesep)
+                writer.writerow([recent_data.index.name or '', *recent_data.columns])
+                writer.writerows(rows)
         
         print(f"💾 CSV 파일이 저장되었습니다: {filepath}")
         print(f"📊 데이터: 최근 50개 거래주 OHLCV + 기술적 지표")
@@ -815,93 +919,146 @@ def save_chart_data_to_csv(chart_data, stock_code, stock_name):
         print(f"❌ CSV 파일 저장 중 오류: {e}")
         return None
 
-def save_chart_summary_to_text(chart_data, stock_code, stock_name):
-    """차트 데이터 요약을 텍스트로 저장 - AI 분석 최적화"""
+def _downcast_for_storage(chart_data):
+    """열 기반 파일 저장용으로 가격/지표는 float32, 거래량은 담을 수 있는 가장 작은 부호 없는 정수로 축소"""
+    dtypes = {col: 'float32' for col in chart_data.select_dtypes(include='float').columns if col != 'Volume'}
+    downcast = chart_data.astype(dtypes)
+    if 'Volume' in downcast:
+        downcast['Volume'] = pd.to_numeric(downcast['Volume'], downcast='unsigned')
+    return downcast
+
+def save_chart_data_to_parquet(chart_data, stock_code, stock_name, date_tag=None):
+    """차트 데이터 전체를 Parquet 파일 하나로 저장 (zstd 압축, pyarrow 필요) - CSV/텍스트 요약과 함께 저장되는 보조 데이터 파일"""
     if chart_data is None or chart_data.empty:
         print("❌ 저장할 차트 데이터가 없습니다.")
         return None
     
+    # pyarrow가 없으면 빈 저장 폴더를 만들지 않고 바로 종료
+    if pa is None:
+        print("❌ Parquet 파일 저장에는 pyarrow가 필요합니다 (pip install pyarrow)")
+        return None
+    
     try:
-        print(f"\n📊 차트 데이터 요약을 텍스트로 저장합니다...")
-        
-        # 텍스트 저장 디렉토리 생성
-        text_dir = "chart_data_text"
-        if not os.path.exists(text_dir):
-            os.makedirs(text_dir)
-            print(f"📁 {text_dir} 폴더를 생성했습니다.")
+        print(f"\n📊 차트 데이터를 Parquet로 저장합니다...")
         
         # 파일명 생성
-        current_date = datetime.now().strftime("%Y%m%d")
-        filename = f"weekly_{stock_name}_{stock_code}_{current_date}_summary.txt"
-        filename = filename.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_")
-        filepath = os.path.join(text_dir, filename)
+        current_date = date_tag or datetime.now().strftime("%Y%m%d")
+        filename = f"weekly_{stock_name}_{stock_code}_{current_date}.parquet"
+        filename = filename.translate(FILENAME_TRANSLATION)
         
-        # 중복 확인
-        version = 1
-        while os.path.exists(filepath):
-            name_without_ext = filename.rsplit('.', 1)[0]
-            ext = filename.rsplit('.', 1)[1]
-            filename = f"{name_without_ext}_v{version}.{ext}"
-            filepath = os.path.join(text_dir, filename)
-            version += 1
+        # 파일 중복 시 버전 추가
+        filepath = _unique_path(OUTPUT_DIRS['parquet'], filename)
+        
+        # 날짜 인덱스는 컬럼으로 저장
+        # JSON/텍스트는 원래 정밀도를 유지하고, 이 파일만 축소된 자료형으로 저장해 크기를 줄임
+        _downcast_for_storage(chart_data).reset_index().to_parquet(
+            filepath, engine='pyarrow', compression='zstd', compression_level=3, use_dictionary=True)
         
-        # 요약 텍스트 생성
-        summary_text = f"""주식 주봉 차트 데이터 요약
+        print(f"💾 Parquet 파일이 저장되었습니다: {filepath}")
+        print(f"📊 데이터: 전체 {len(chart_data)}개 거래주 OHLCV + 기술적 지표")
+        
+        return filepath
+        
+    except Exception as e:
+        print(f"❌ Parquet 파일 저장 중 오류: {e}")
+        return None
+
+# 텍스트 요약 머리말 템플릿 (format_map으로 _compute_summary_stats 값과 종목 정보를 채움)
+TEXT_SUMMARY_TEMPLATE = """주식 주봉 차트 데이터 요약
 ========================
 
 종목 정보:
 - 종목명: {stock_name}
 - 종목코드: {stock_code}
-- 생성일시: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- 데이터 기간: {chart_data.index[0].strftime('%Y-%m-%d')} ~ {chart_data.index[-1].strftime('%Y-%m-%d')}
-- 총 데이터 수: {len(chart_data)}주
+- 생성일시: {created_at}
+- 데이터 기간: {start} ~ {end}
+- 총 데이터 수: {total_records}주
 
 가격 정보:
-- 시작가: {chart_data['Open'].iloc[0]:,.0f}원
-- 최근 종가: {chart_data['Close'].iloc[-1]:,.0f}원
-- 최고가: {chart_data['High'].max():,.0f}원
-- 최저가: {chart_data['Low'].min():,.0f}원
-- 가격 변동: {chart_data['Close'].iloc[-1] - chart_data['Open'].iloc[0]:+,.0f}원
-- 변동률: {((chart_data['Close'].iloc[-1] / chart_data['Open'].iloc[0]) - 1) * 100:+.2f}%
+- 시작가: {first_open:,.0f}원
+- 최근 종가: {last_close:,.0f}원
+- 최고가: {high:,.0f}원
+- 최저가: {low:,.0f}원
+- 가격 변동: {price_change:+,.0f}원
+- 변동률: {price_change_pct:+.2f}%
 
 거래량 정보:
-- 평균 거래량: {chart_data['Volume'].mean():,.0f}주
-- 최대 거래량: {chart_data['Volume'].max():,.0f}주
-- 최근 거래량: {chart_data['Volume'].iloc[-1]:,.0f}주
+- 평균 거래량: {volume_mean:,.0f}주
+- 최대 거래량: {volume_max:,.0f}주
+- 최근 거래량: {volume_last:,.0f}주
 
 기술적 지표 (최근값):
 """
+
+# 텍스트 요약의 기술적 지표 항목 (컬럼명, 표시 이름, 숫자 포맷, 단위)
+TEXT_SUMMARY_INDICATORS = [
+    ('MA5', '5주 이동평균', ',.0f', '원'),
+    ('MA20', '20주 이동평균', ',.0f', '원'),
+    ('MA60', '60주 이동평균', ',.0f', '원'),
+    ('Stoch_K', '스토캐스틱 %K', '.1f', ''),
+    ('Stoch_D', '스토캐스틱 %D', '.1f', ''),
+    ('BB_Upper', '볼린저 밴드 상단', ',.0f', '원'),
+    ('BB_Lower', '볼린저 밴드 하단', ',.0f', '원'),
+    ('BB_Middle', '볼린저 밴드 중간', ',.0f', '원'),
+]
+
+def save_chart_summary_to_text(chart_data, stock_code, stock_name, stats=None, date_tag=None):
+    """차트 데이터 요약을 텍스트로 저장 - AI 분석 최적화 (stats: _compute_summary_stats 결과, 없으면 계산)"""
+    if chart_data is None or chart_data.empty:
+        print("❌ 저장할 차트 데이터가 없습니다.")
+        return None
+    
+    try:
+        print(f"\n📊 차트 데이터 요약을 텍스트로 저장합니다...")
+        
+        # 파일명 생성
+        current_date = date_tag or datetime.now().strftime("%Y%m%d")
+        filename = f"weekly_{stock_name}_{stock_code}_{current_date}_summary.txt"
+        filename = filename.translate(FILENAME_TRANSLATION)
+        
+        # 텍스트 저장 디렉토리 생성 및 파일 중복 시 버전 추가
+        filepath = _unique_path(OUTPUT_DIRS['text'], filename)
+        
+        # 요약값/최신 지표 값 (main에서 미리 계산해 넘겨주면 재사용)
+        if stats is None:
+            stats = _compute_summary_stats(chart_data)
+        
+        # 요약 텍스트는 조각 리스트에 모은 뒤 마지막에 한 번만 합침 (+= 반복 복사 방지)
+        parts = [TEXT_SUMMARY_TEMPLATE.format_map({
+            **stats,
+            'stock_name': stock_name,
+            'stock_code': stock_code,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'start': chart_data.index[0].strftime('%Y-%m-%d'),
+            'end': chart_data.index[-1].strftime('%Y-%m-%d'),
+            'total_records': len(chart_data),
+            'price_change': stats['last_close'] - stats['first_open'],
+            'price_change_pct': ((stats['last_close'] / stats['first_open']) - 1) * 100,
+        })]
         
         # 기술적 지표 추가
-        if 'MA5' in chart_data:
-            summary_text += f"- 5주 이동평균: {chart_data['MA5'].iloc[-1]:,.0f}원\n"
-        if 'MA20' in chart_data:
-            summary_text += f"- 20주 이동평균: {chart_data['MA20'].iloc[-1]:,.0f}원\n"
-        if 'MA60' in chart_data:
-            summary_text += f"- 60주 이동평균: {chart_data['MA60'].iloc[-1]:,.0f}원\n"
-        if 'Stoch_K' in chart_data:
-            summary_text += f"- 스토캐스틱 %K: {chart_data['Stoch_K'].iloc[-1]:.1f}\n"
-        if 'Stoch_D' in chart_data:
-            summary_text += f"- 스토캐스틱 %D: {chart_data['Stoch_D'].iloc[-1]:.1f}\n"
-        if 'BB_Upper' in chart_data:
-            summary_text += f"- 볼린저 밴드 상단: {chart_data['BB_Upper'].iloc[-1]:,.0f}원\n"
-        if 'BB_Lower' in chart_data:
-            summary_text += f"- 볼린저 밴드 하단: {chart_data['BB_Lower'].iloc[-1]:,.0f}원\n"
-        if 'BB_Middle' in chart_data:
-            summary_text += f"- 볼린저 밴드 중간: {chart_data['BB_Middle'].iloc[-1]:,.0f}원\n"
-        
-        summary_text += f"""
+        for column, label, spec, unit in TEXT_SUMMARY_INDICATORS:
+            if column in stats['latest']:
+                parts.append(f"- {label}: {stats['latest'][column]:{spec}}{unit}\n")
+        
+        parts.append(f"""
 최근 10개 거래주 데이터:
-"""
+""")
         
-        # 최근 10개 데이터 추가
+        # 최근 10개 데이터 추가 (일봉/월봉 요약과 같은 줄 형식, 행 단위 순회 없이 컬럼별 문자열 포맷 후 결합)
         recent_data = chart_data.tail(10)
-        for date, row in recent_data.iterrows():
-            summary_text += f"{date.strftime('%Y-%m-%d')}: {row['Open']:,.0f} → {row['Close']:,.0f} (거래량: {row['Volume']:,.0f})\n"
+        fmt_number = '{:,.0f}'.format
+        recent_lines = (recent_data.index.strftime('%Y-%m-%d') + ': '
+                        + recent_data['Open'].map(fmt_number) + ' → '
+                        + recent_data['Close'].map(fmt_number) + ' (거래량: '
+                        + recent_data['Volume'].map(fmt_number) + ')\n')
+        parts.extend(recent_lines)
+        
+        summary_text = ''.join(parts)
         
-        # 텍스트 파일 저장
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(summary_text)
+        # 텍스트 파일 저장 (UTF-8 바이트로 한 번에 기록 - 텍스트 모드 인코딩 계층 생략)
+        with open(filepath, 'wb') as f:
+            f.write(summary_text.encode('utf-8'))
         
         print(f"💾 텍스트 요약 파일이 저장되었습니다: {filepath}")
         
@@ -1052,24 +1209,44 @@ def main():
     hist = get_weekly_stock_data(stock_code)
     
     if hist is not None:
+        # 기술적 지표는 한 번만 계산해 분석과 차트에서 함께 사용
+        hist = calculate_technical_indicators(hist)
+        
         # 주봉 데이터 분석
         analyze_weekly_stock_data(hist, stock_code)
         
+        # 차트/데이터 파일명에 쓸 날짜는 한 번만 계산해 모든 저장에 전달
+        date_tag = datetime.now().strftime("%Y%m%d")
+        
         # 주봉 차트 생성 (차트 데이터 반환)
-        chart_path, chart_data = create_weekly_stock_chart(hist, stock_code)
+        chart_path, chart_data = create_weekly_stock_chart(hist, stock_code, date_tag=date_tag)
         
         if chart_path and chart_data is not None:
             # 종목명 가져오기
             stock_name = get_stock_name(stock_code)
             
-            # JSON 저장 (추천)
-            json_path = save_chart_data_to_json(chart_data, stock_code, stock_name)
+            # 저장 파일들이 공통으로 쓰는 요약값은 한 번만 계산
+            stats = _compute_summary_stats(chart_data)
             
-            # CSV 저장 (보조)
-            csv_path = save_chart_data_to_csv(chart_data, stock_code, stock_name)
+            # 저장할 파일 목록: JSON (추천 - AI 분석용), CSV/텍스트 요약 (AI 분석이 함께 읽음),
+            # Parquet (전체 데이터 - 빠르고 작은 열 기반 형식, pyarrow 필요)
+            # (저장 함수, 추가 키워드 인자)
+            savers = {
+                'json': (save_chart_data_to_json, {'stats': stats, 'date_tag': date_tag}),
+                'csv': (save_chart_data_to_csv, {'date_tag': date_tag}),
+                'text': (save_chart_summary_to_text, {'stats': stats, 'date_tag': date_tag}),
+                'data': (save_chart_data_to_parquet, {'date_tag': date_tag}),
+            }
             
-            # 텍스트 요약 저장 (보조)
-            text_path = save_chart_summary_to_text(chart_data, stock_code, stock_name)
+            # 각 저장은 서로 독립적이므로 동시에 실행 (저장 함수는 실패 시 None 반환)
+            with ThreadPoolExecutor(max_workers=len(savers)) as executor:
+                futures = {name: executor.submit(saver, chart_data, stock_code, stock_name, **kwargs)
+                           for name, (saver, kwargs) in savers.items()}
+            saved_paths = {name: future.result() for name, future in futures.items()}
+            json_path = saved_paths['json']
+            data_path = saved_paths['data']
+            csv_path = saved_paths['csv']
+            text_path = saved_paths['text']
             
             if json_path:
                 print(f"\n✅ 주봉 분석이 완료되었습니다!")
@@ -1079,6 +1256,8 @@ def main():
                     print(f"📋 CSV 데이터: {csv_path}")
                 if text_path:
                     print(f"📝 텍스트 요약: {text_path}")
+                if data_path:
+                    print(f"🗂️ Parquet 데이터: {data_path}")
                 print(f"\n💡 이제 AI 분석에 차트 이미지와 JSON 데이터를 함께 전달할 수 있습니다!")
             else:
                 print(f"\n✅ 주봉 분석이 완료되었습니다!")